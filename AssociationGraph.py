@@ -0,0 +1,175 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The AssociationGraph class stores how often two IDs were associated with each other.
+# Every ID is mapped to a small integer, and the counts are kept as a sparse matrix in
+# compressed sparse row (CSR) form: for the row of an ID, indptr gives the range of entries in
+# indices (the associated IDs) and counts (how often they were associated). New associations are
+# collected in compact buffers and merged into the matrix the next time it is read.
+# The class also behaves like the dictionary of dictionaries it replaces, so
+# graph.get(id1) returns a dictionary mapping every associated ID to its count.
+
+from array import array
+from itertools import count, filterfalse
+
+import numpy as np
+
+
+class AssociationGraph:
+    def __init__(self):
+        self._ids = {}    # ID -> row number
+        self._names = []  # row number -> ID
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._counts = np.zeros(0, dtype=np.int32)
+        # Associations added since the matrix was last built: single pairs and whole blocks of rows
+        self._pending_rows = array('i')
+        self._pending_cols = array('i')
+        self._pending_blocks = []
+
+    @classmethod
+    def from_pairs(cls, ids, nodes):
+        """
+        Creates a graph in bulk. ids maps every ID to its row number, numbered in order of first
+        appearance, and nodes is an array of row numbers holding the two IDs of each association
+        one after the other. Repeated pairs are added up when the matrix is first read.
+        """
+        graph = cls()
+        graph._ids = ids
+        graph._names = list(ids)
+        pairs = np.frombuffer(nodes, dtype=np.intc).reshape(-1, 2)
+        if len(pairs):
+            # Every association is counted in both directions
+            rows = np.concatenate((pairs[:, 0], pairs[:, 1])).astype(np.int32)
+            cols = np.concatenate((pairs[:, 1], pairs[:, 0])).astype(np.int32)
+            graph._pending_blocks.append((rows, cols, np.ones(len(rows), dtype=np.int32)))
+        return graph
+
+    def _node(self, item_id):
+        """Returns the row number of an ID, giving it the next free number if it is new."""
+        node = self._ids.get(item_id)
+        if node is None:
+            node = self._ids[item_id] = len(self._names)
+            self._names.append(item_id)
+        return node
+
+    def add(self, id1, id2, count=1):
+        """Records that two IDs were associated, counting both the direct and the reverse association."""
+        node1 = self._node(id1)
+        node2 = self._node(id2)
+        for _ in range(count):
+            self._pending_rows.append(node1)
+            self._pending_cols.append(node2)
+            self._pending_rows.append(node2)
+            self._pending_cols.append(node1)
+
+    def update(self, other):
+        """Adds all association counts of another graph to this one."""
+        other._build()
+        if not len(other._counts):
+            return
+        if not self._names:
+            # An empty graph takes over the matrix of the other one; _build never changes arrays in place
+            self._ids = dict(other._ids)
+            self._names = list(other._names)
+            self._indptr, self._indices, self._counts = other._indptr, other._indices, other._counts
+            return
+        # Number the IDs new to this graph in bulk, in the order the other graph first saw them,
+        # then translate the row numbers of the other graph into row numbers of this one
+        new_ids = list(filterfalse(self._ids.__contains__, other._names))
+        self._ids.update(zip(new_ids, count(len(self._names))))
+        self._names.extend(new_ids)
+        mapping = np.fromiter(map(self._ids.__getitem__, other._names), dtype=np.int32, count=len(other._names))
+        rows = np.repeat(np.arange(len(other._names), dtype=np.int32), np.diff(other._indptr))
+        self._pending_blocks.append((mapping[rows], mapping[other._indices], other._counts))
+
+    def _build(self):
+        """Merges the pending associations into the sparse matrix, adding up the counts of repeated pairs."""
+        if not len(self._pending_rows) and not self._pending_blocks:
+            return
+        size = len(self._names)
+        old_rows = np.repeat(np.arange(len(self._indptr) - 1, dtype=np.int32), np.diff(self._indptr))
+        single_rows = np.frombuffer(self._pending_rows, dtype=np.intc)
+        single_cols = np.frombuffer(self._pending_cols, dtype=np.intc)
+        rows = np.concatenate([old_rows, single_rows] + [block[0] for block in self._pending_blocks])
+        cols = np.concatenate([self._indices, single_cols] + [block[1] for block in self._pending_blocks])
+        counts = np.concatenate([self._counts, np.ones(len(single_rows), dtype=np.int32)]
+                                + [block[2] for block in self._pending_blocks])
+
+        # Sort the pairs by (row, column) and add up the counts of equal pairs
+        keys = rows.astype(np.int64) * size + cols
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        unique_keys = keys[starts]
+        self._counts = np.add.reduceat(counts[order], starts).astype(np.int32)
+        self._indices = (unique_keys % size).astype(np.int32)
+        self._indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(unique_keys // size, minlength=size), out=self._indptr[1:])
+
+        self._pending_rows = array('i')
+        self._pending_cols = array('i')
+        self._pending_blocks = []
+
+    def top_k(self, item_id, k=None, accept=None):
+        """
+        Returns up to k (ID, count) pairs associated with the given ID, ranked by count from most to least
+        associated; ties keep the order in which the IDs were first seen. Without k, all of them are returned.
+        If accept is given, only IDs for which accept(ID) is true are included.
+        """
+        node = self._ids.get(item_id)
+        if node is None or k == 0:
+            return []
+        self._build()
+        start, end = self._indptr[node], self._indptr[node + 1]
+        cols = self._indices[start:end]
+        counts = self._counts[start:end]
+        result = []
+        for position in np.lexsort((cols, -counts)):
+            name = self._names[cols[position]]
+            if accept is None or accept(name):
+                result.append((name, int(counts[position])))
+                if k is not None and len(result) >= k:
+                    break
+        return result
+
+    def matrix(self):
+        """Returns the IDs of the rows and the indptr, indices and counts arrays of the sparse matrix."""
+        self._build()
+        return self._names, self._indptr, self._indices, self._counts
+
+    def pair_count(self):
+        """Returns the number of associations recorded, counting every pair once."""
+        self._build()
+        return int(self._counts.sum()) // 2
+
+    def self_loop_count(self):
+        """Returns the number of associations between an ID and itself."""
+        self._build()
+        rows = np.repeat(np.arange(len(self._indptr) - 1), np.diff(self._indptr))
+        return int(self._counts[self._indices == rows].sum()) // 2
+
+    def nbytes(self):
+        """Returns the number of bytes used by the arrays of the sparse matrix."""
+        self._build()
+        return self._indptr.nbytes + self._indices.nbytes + self._counts.nbytes
+
+    # Dictionary-like access, matching the dictionary of dictionaries used before
+    def get(self, item_id, default=None):
+        """Returns a dictionary mapping each ID associated with the given ID to its count, ranked by count."""
+        if item_id not in self._ids:
+            return default
+        return dict(self.top_k(item_id))
+
+    def __getitem__(self, item_id):
+        if item_id not in self._ids:
+            raise KeyError(item_id)
+        return self.get(item_id)
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
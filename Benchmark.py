@@ -0,0 +1,308 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Benchmarks for the hot paths of the Recommender, runnable without a display.
+# A deterministic generator writes synthetic show, book and association files with the same columns
+# as the real data files. For every requested scale the files are generated once and then loaded and
+# queried in a separate Python process, timing the loads, the title lists, the statistics, both searches
+# and the recommendations. Wall time, throughput and peak memory of every operation are written to a
+# JSON file so runs can be compared over time.
+# The import time of the core and the GUI modules is measured in fresh interpreters as well and compared
+# with a budget; the core must import without any GUI or plotting module, and the GUI without matplotlib.
+# A last check loads rows cut short, as a row that is still being written looks, to keep them loading.
+#
+# Usage: python Benchmark.py --rows 10000 100000 1000000 --output benchmark.json
+#        python Benchmark.py --check-imports
+#        python Benchmark.py --check-rows
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+SHOW_COLUMNS = ['show_id', 'type', 'title', 'director', 'cast', 'average_rating', 'country', 'date_added',
+                'release_year', 'rating', 'duration', 'listed_in', 'description']
+BOOK_COLUMNS = ['bookID', 'title', 'authors', 'average_rating', 'isbn', 'isbn13', 'language_code', 'num_pages',
+                'ratings_count', 'publication_date', 'publisher']
+
+WORDS = ['night', 'star', 'river', 'city', 'ghost', 'king', 'queen', 'love', 'war', 'secret', 'summer', 'winter',
+         'dream', 'shadow', 'house', 'road', 'island', 'storm', 'garden', 'fire', 'blood', 'light', 'moon', 'ocean']
+FIRST_NAMES = ['Anna', 'Ben', 'Carla', 'David', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas', 'Kemi', 'Liam',
+               'Maya', 'Noah', 'Olga', 'Pedro', 'Quinn', 'Rosa', 'Sven', 'Tara', 'Umar', 'Vera', 'Wei', 'Yara']
+LAST_NAMES = ['Adams', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Hughes', 'Ito', 'Jensen', 'Khan',
+              'Lopez', 'Moreau', 'Novak', 'Okafor', 'Park', 'Rossi', 'Silva', 'Tanaka', 'Weber']
+GENRES = ['Dramas', 'Comedies', 'Documentaries', 'Action & Adventure', 'Thrillers', 'Romantic Movies',
+          'International TV Shows', 'Crime TV Shows', 'Kids\' TV', 'Horror Movies', 'Docuseries', 'Anime Series']
+RATINGS = ['TV-MA', 'TV-14', 'TV-PG', 'R', 'PG-13', 'PG', 'TV-Y7', 'TV-G', 'NR']
+COUNTRIES = ['United States', 'India', 'United Kingdom', 'Japan', 'South Korea', 'Canada', 'Spain', 'France']
+PUBLISHERS = ['Penguin Books', 'Vintage', 'Ballantine Books', 'HarperCollins', 'Tor Books', 'Scholastic',
+              'Bantam', 'Simon & Schuster', 'Del Rey', 'Oxford University Press']
+LANGUAGES = ['eng', 'en-US', 'spa', 'fre', 'ger', 'jpn']
+
+# Seconds a fresh interpreter may take to import each module (the fastest of several runs counts)
+IMPORT_BUDGETS = {'Recommender': 0.35, 'RecommenderGUI': 0.5}
+# Modules that must not be imported together with each module; they are only loaded when used
+IMPORT_FORBIDDEN = {'Recommender': ('tkinter', 'matplotlib', 'cProfile', 'tracemalloc', 'concurrent.futures.process'),
+                    'RecommenderGUI': ('matplotlib',)}
+
+
+def _title(rng):
+    return ' '.join(rng.sample(WORDS, rng.randint(1, 4))).title()
+
+
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def generate_dataset(directory, rows, seed=551):
+    """
+    Writes shows.csv, books.csv and associations.csv with the given number of shows and books
+    (and twice as many associations) into a directory. The same seed always gives the same files.
+    Returns the paths of the three files.
+    """
+    rng = random.Random(seed)
+    paths = {kind: os.path.join(directory, f"{kind}.csv") for kind in ('shows', 'books', 'associations')}
+
+    with open(paths['shows'], 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(SHOW_COLUMNS)
+        for i in range(rows):
+            show_type = 'Movie' if rng.random() < 0.7 else 'TV Show'
+            if show_type == 'Movie':
+                duration = f"{rng.randint(60, 180)} min"
+            else:
+                seasons = rng.randint(1, 9)
+                duration = f"{seasons} Season" if seasons == 1 else f"{seasons} Seasons"
+            writer.writerow([
+                f"s{i + 1}", show_type, _title(rng),
+                ', '.join(_person(rng) for _ in range(rng.randint(0, 2))),
+                ', '.join(_person(rng) for _ in range(rng.randint(0, 6))),
+                f"{rng.uniform(1, 5):.2f}", rng.choice(COUNTRIES), f"September {rng.randint(1, 28)}, 2021",
+                str(rng.randint(1960, 2021)), rng.choice(RATINGS), duration,
+                ', '.join(rng.sample(GENRES, rng.randint(1, 3))),
+                f"A story about {rng.choice(WORDS)}, {rng.choice(WORDS)} and \"{rng.choice(WORDS)}\".",
+            ])
+
+    with open(paths['books'], 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(BOOK_COLUMNS)
+        for i in range(rows):
+            isbn = f"{rng.randrange(10 ** 9, 10 ** 10)}"
+            writer.writerow([
+                str(i + 1), _title(rng), '/'.join(_person(rng) for _ in range(rng.randint(1, 2))),
+                f"{rng.uniform(1, 5):.2f}", isbn, f"978{isbn}", rng.choice(LANGUAGES), str(rng.randint(20, 1200)),
+                str(rng.randint(0, 500000)), f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(1950, 2020)}",
+                rng.choice(PUBLISHERS),
+            ])
+
+    with open(paths['associations'], 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        for _ in range(rows * 2):
+            writer.writerow([f"s{rng.randint(1, rows)}", str(rng.randint(1, rows))])
+    return paths
+
+
+def _peak_memory_mb():
+    """Returns the peak resident memory of this process in megabytes, or None where it is not available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(results, name, function, items, repeat=1):
+    """Runs a function repeat times and records its mean wall time, throughput and the peak memory so far."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        value = function()
+    seconds = (time.perf_counter() - start) / repeat
+    results[name] = {
+        'seconds': seconds,
+        'items_per_second': items / seconds if seconds else None,
+        'peak_memory_mb': _peak_memory_mb(),
+    }
+    return value
+
+
+def measure_imports(repeat=5):
+    """
+    Imports every budgeted module in fresh interpreters and returns, per module, the fastest import time,
+    its budget, the forbidden modules it imported and whether it met the budget.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module, budget in IMPORT_BUDGETS.items():
+        code = (f"import json, sys, time\nstart = time.perf_counter()\nimport {module}\n"
+                f"seconds = time.perf_counter() - start\n"
+                f"print(json.dumps([seconds, [name for name in {IMPORT_FORBIDDEN[module]!r} if name in sys.modules]]))")
+        runs = [json.loads(subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                                          cwd=directory).stdout) for _ in range(repeat)]
+        seconds = min(run[0] for run in runs)
+        forbidden = runs[0][1]
+        results[module] = {
+            'seconds': seconds,
+            'budget_seconds': budget,
+            'forbidden_imports': forbidden,
+            'within_budget': seconds <= budget and not forbidden,
+        }
+    return results
+
+
+def check_short_rows():
+    """
+    Loads show and book files whose last row is cut short right after the title, as a row that is still
+    being written looks, then lets update_files read the rest of those rows and another short row of each.
+    Missing trailing columns are read as empty fields, which the records must accept like the original
+    constructors did. Returns a list of the problems found, empty if there are none.
+    """
+    from Recommender import Recommender
+
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate_dataset(directory, 20)
+        with open(paths['shows'], 'a', newline='', encoding='utf-8') as file:
+            file.write('s21,Movie,Short Row')
+        with open(paths['books'], 'a', newline='', encoding='utf-8') as file:
+            file.write('21,Short Book')
+        recommender = Recommender()
+        try:
+            recommender.load_files(shows=paths['shows'], books=paths['books'])
+            if recommender.shows['s21'].get_genre_list() != [] or recommender.books['21'].get_author_list() != []:
+                problems.append("a row cut after its title got names")
+            with open(paths['shows'], 'a', newline='', encoding='utf-8') as file:
+                file.write(',Anna Chen,Ben Park,3.50,Japan,"September 1, 2021",2001,PG,90 min,Dramas,A short row.\r\n'
+                           's22,TV Show,Other Row,,,4.00,India,2021,2019,TV-14,2 Seasons\r\n')
+            with open(paths['books'], 'a', newline='', encoding='utf-8') as file:
+                file.write(',Anna Chen,4.00,1234567890,9781234567890,eng,300,10,1/1/2000,Vintage\r\n'
+                           '22,Other Book,Ben Park/Anna Chen,3.00,1234567891,9781234567891,eng,120\r\n')
+            recommender.update_files()
+            if (recommender.shows['s21'].get_genre_list() != ['Dramas']
+                    or recommender.books['21'].get_publisher() != 'Vintage'):
+                problems.append("the completed rows did not replace the short ones")
+            if recommender.shows['s22'].get_genre_list() != [] or recommender.books['22'].get_publisher() != '':
+                problems.append("a row cut after its length got the later columns")
+            recommender.get_movie_stats(), recommender.get_tv_stats(), recommender.get_book_stats()
+            recommender.get_movie_list(), recommender.get_book_list()
+            recommender.search_tv_movies('TV Show', 'row', '', '', ''), recommender.search_books('book', 'anna', '')
+        except Exception as error:
+            problems.append(f"short rows failed with {error!r}")
+    return problems
+
+
+def run_scale(paths, rows, repeat=3):
+    """
+    Loads the given files into a new Recommender and times every benchmarked operation. The query cache
+    is disabled and the previous searches are forgotten before every run, so repeated runs time the
+    queries themselves rather than cache hits.
+    """
+    from Recommender import Recommender
+
+    recommender = Recommender(cache_size=0)
+    results = {}
+
+    def uncached(function):
+        def run():
+            recommender._last_searches.clear()  # Searches would otherwise narrow the results of the last one
+            return function()
+        return run
+
+    _measure(results, 'load_shows', lambda: recommender.load_shows(paths['shows']), rows)
+    _measure(results, 'load_books', lambda: recommender.load_books(paths['books']), rows)
+    _measure(results, 'load_associations', lambda: recommender.load_associations(paths['associations']), rows * 2)
+
+    _measure(results, 'get_movie_list', recommender.get_movie_list, rows, repeat)
+    _measure(results, 'get_tv_list', recommender.get_tv_list, rows, repeat)
+    _measure(results, 'get_book_list', recommender.get_book_list, rows, repeat)
+    _measure(results, 'get_movie_stats', recommender.get_movie_stats, rows, repeat)
+    _measure(results, 'get_tv_stats', recommender.get_tv_stats, rows, repeat)
+    _measure(results, 'get_book_stats', recommender.get_book_stats, rows, repeat)
+
+    # Queries of different selectivity; the seed titles are taken from the loaded data,
+    # so no recommendation lookup misses and no warning dialog is ever shown
+    show_queries = [('Movie', 'star', '', '', ''), ('TV Show', '', '', 'anna', ''),
+                    ('Movie', 'night river', '', '', 'dramas'), ('TV Show', 'a', 'chen', '', '')]
+    book_queries = [('ghost', '', ''), ('', 'tanaka', ''), ('moon', '', 'penguin'), ('e', 'a', '')]
+    seeds = {}
+    for show in recommender.shows.values():
+        seeds.setdefault(show.get_show_type(), show.get_title())
+    seeds['Book'] = next(iter(recommender.books.values())).get_title()
+    seeds = list(seeds.items())
+    _measure(results, 'search_tv_movies',
+             uncached(lambda: [recommender.search_tv_movies(*query) for query in show_queries]),
+             len(show_queries), repeat)
+    _measure(results, 'search_books',
+             uncached(lambda: [recommender.search_books(*query) for query in book_queries]), len(book_queries), repeat)
+    _measure(results, 'get_recommendations', lambda: [recommender.get_recommendations(*seed) for seed in seeds],
+             len(seeds), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Recommender on synthetic data without a display.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help="numbers of shows and books to generate, one benchmark per number")
+    parser.add_argument('--output', default='benchmark.json', help="JSON file the results are written to")
+    parser.add_argument('--repeat', type=int, default=3, help="runs of every query operation to average over")
+    parser.add_argument('--seed', type=int, default=551, help="seed of the synthetic data generator")
+    parser.add_argument('--check-imports', action='store_true',
+                        help="only measure the import times; exit with status 1 if a module is over its budget")
+    parser.add_argument('--check-rows', action='store_true',
+                        help="only check that rows cut short load; exit with status 1 if one does not")
+    parser.add_argument('--worker', nargs=2, metavar=('DIRECTORY', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.check_imports:
+        imports = measure_imports()
+        for module, result in imports.items():
+            status = "ok" if result['within_budget'] else "OVER BUDGET"
+            extra = f", imports {', '.join(result['forbidden_imports'])}" if result['forbidden_imports'] else ""
+            print(f"{module}: {result['seconds'] * 1000:.0f} ms "
+                  f"(budget {result['budget_seconds'] * 1000:.0f} ms{extra}) {status}")
+        sys.exit(0 if all(result['within_budget'] for result in imports.values()) else 1)
+
+    if args.check_rows:
+        problems = check_short_rows()
+        print("\n".join(problems) if problems else "Short rows load ok")
+        sys.exit(1 if problems else 0)
+
+    if args.worker:
+        # Runs a single scale inside a fresh process so the memory figures do not include earlier scales
+        directory, rows = args.worker[0], int(args.worker[1])
+        paths = {kind: os.path.join(directory, f"{kind}.csv") for kind in ('shows', 'books', 'associations')}
+        json.dump(run_scale(paths, rows, args.repeat), sys.stdout)
+        return
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'imports': measure_imports(),
+        'scales': {},
+    }
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"Generating {rows} rows...", file=sys.stderr)
+            generate_dataset(directory, rows, args.seed)
+            print(f"Benchmarking {rows} rows...", file=sys.stderr)
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--repeat', str(args.repeat),
+                                     '--worker', directory, str(rows)],
+                                    check=True, capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+            report['scales'][str(rows)] = json.loads(output)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,25 @@
 # and mutator methods to ensure data integrity and secure access.
 
 
-from Media import Media  # Import the Media base class
+from Media import Media, split_names  # Import the Media base class
+
+# Authors are separated by slashes
+AUTHOR_SEPARATOR = '/'
 
 class Book(Media):  # Subclass of Media
-    def __init__(self, media_id, title, avg_rating, authors, isbn, isbn13, language_code, num_pages, ratings_count, publication_date, publisher):
+    # Attributes are kept in slots rather than a per-instance dictionary to save memory
+    __slots__ = ('_authors', '_isbn', '_isbn13', '_language_code', '_num_pages', '_ratings_count',
+                 '_publication_date', '_publisher', '_author_names')
+
+    def __init__(self, media_id, title, avg_rating, authors, isbn, isbn13, language_code, num_pages, ratings_count, publication_date, publisher,
+                 author_names=None):
         # Initialize Media's attributes
         super().__init__(media_id, title, avg_rating)
 
         # Initialize Book's specific attributes
         self._authors = authors
+        # Also split into a tuple of names once; author_names holds it when it was split before
+        self._author_names = split_names(authors, AUTHOR_SEPARATOR) if author_names is None else author_names
         self._isbn = isbn
         self._isbn13 = isbn13
         self._language_code = language_code
@@ -25,12 +35,22 @@ class Book(Media):  # Subclass of Media
         self._publication_date = publication_date
         self._publisher = publisher
 
+    # Pickle as a constructor call, which is much faster than the default handling of slotted objects
+    def __reduce__(self):
+        return (Book, (self._id, self._title, self._avg_rating, self._authors, self._isbn, self._isbn13,
+                       self._language_code, self._num_pages, self._ratings_count, self._publication_date,
+                       self._publisher, self._author_names))
+
     # Accessors (getters) and Mutators (setters) for each attribute
     def get_authors(self):
         return self._authors
 
+    def get_author_list(self):
+        return list(self._author_names)
+
     def set_authors(self, authors):
         self._authors = authors
+        self._author_names = split_names(authors, AUTHOR_SEPARATOR)
 
     def get_avg_rating(self):
         return self._avg_rating
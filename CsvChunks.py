@@ -0,0 +1,153 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Splits a CSV file into byte ranges that each hold complete records, so the ranges
+# can be parsed independently, for example in separate processes.
+# A line break only ends a record when it is outside a quoted field. Quoted fields may contain line
+# breaks (titles and descriptions do), and a quote inside a quoted field is written twice, so a line
+# break is outside every quoted field exactly when the number of quote characters before it is even.
+# The file is scanned once, counting quotes in large blocks, and every range ends at the first line
+# break with an even quote count after its planned end.
+# The same test finds the complete records appended to a growing file since a known record boundary:
+# they end at the last line break with an even number of quotes between the boundary and it.
+
+import io
+import mmap
+import os
+
+# Bytes counted at once while scanning for quotes
+SCAN_BLOCK = 16 * 1024 * 1024
+
+
+def _count_quotes(data, start, end):
+    """Returns the number of quote characters between two offsets, counting in blocks to limit memory."""
+    quotes = 0
+    while start < end:
+        stop = min(end, start + SCAN_BLOCK)
+        quotes += data[start:stop].count(b'"')
+        start = stop
+    return quotes
+
+
+def _next_record_end(data, position, quotes, size):
+    """
+    Returns the offset just after the first line break at or after position that ends a record, and the
+    number of quotes before it; quotes is the number of quotes before position. Returns the size of the
+    file if no later line break ends a record.
+    """
+    while True:
+        newline = data.find(b'\n', position)
+        if newline == -1:
+            return size, quotes + _count_quotes(data, position, size)
+        quotes += _count_quotes(data, position, newline)
+        position = newline + 1
+        if quotes % 2 == 0:
+            return position, quotes
+
+
+def split_records(path, chunks, min_chunk_bytes=0, has_header=True, end=None):
+    """
+    Splits a CSV file into at most the given number of byte ranges of similar size, each starting and
+    ending on a record boundary. Ranges are at least min_chunk_bytes long where possible.
+    Returns the header row as bytes (empty if has_header is False) and a list of (start, end) offsets
+    covering the rest of the file in order, or only the part before the end offset if one is given.
+    """
+    size = os.path.getsize(path)
+    size = size if end is None else min(end, size)
+    if size == 0:
+        return b'', []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header_end, quotes = _next_record_end(data, 0, 0, size) if has_header else (0, 0)
+        header = data[:header_end]
+        body = size - header_end
+        chunks = max(1, min(chunks, body // min_chunk_bytes if min_chunk_bytes else chunks))
+        ranges = []
+        start = position = header_end
+        for number in range(1, chunks):
+            target = header_end + body * number // chunks
+            if target <= position:
+                continue  # The previous range already reaches past this planned end
+            quotes += _count_quotes(data, position, target)
+            end, quotes = _next_record_end(data, target, quotes, size)
+            position = end
+            if end > start:
+                ranges.append((start, end))
+                start = end
+        if start < size:
+            ranges.append((start, size))
+    return header, ranges
+
+
+def read_header(path):
+    """Returns the first record of a CSV file as bytes, including its line break."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return b''
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end, _ = _next_record_end(data, 0, 0, size)
+        return data[:end]
+
+
+def last_record_end(path, start, end=None):
+    """
+    Returns the offset just after the last complete record of a file that starts at or after the
+    given record boundary and ends before the end offset (by default the end of the file), or start
+    itself if no such record ends with a line break yet. A record still being written, without its
+    final line break, is never included.
+    """
+    size = os.path.getsize(path)
+    end = size if end is None else min(end, size)
+    if end <= start:
+        return start
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        quotes = _count_quotes(data, start, end)
+        position = end
+        while True:
+            newline = data.rfind(b'\n', start, position)
+            if newline == -1:
+                return start
+            quotes -= _count_quotes(data, newline, position)  # Now the number of quotes before the line break
+            if quotes % 2 == 0:
+                return newline + 1
+            position = newline
+
+
+class _RangeReader(io.RawIOBase):
+    """Reads a binary file up to an end offset, as if the file ended there."""
+
+    def __init__(self, file, end):
+        self._file = file
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._end - self._file.tell())
+        if size <= 0:
+            return 0
+        return self._file.readinto(memoryview(buffer)[:size])
+
+    def tell(self):
+        return self._file.tell()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def open_range(path, end):
+    """
+    Opens the first end bytes of a CSV file as text, like open(path, newline='', encoding='utf-8'),
+    so a parser reading it stops at the end offset even if the file is longer.
+    """
+    return io.TextIOWrapper(io.BufferedReader(_RangeReader(open(path, 'rb'), end)), encoding='utf-8', newline='')
+
+
+def read_range(path, start, end):
+    """Returns the bytes of a file between two offsets."""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return file.read(end - start)
@@ -0,0 +1,79 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The FileWatcher class keeps a Recommender up to date with data files that grow during the day.
+# A background thread checks the sizes of the loaded files at a fixed interval and, when one has grown,
+# lets the Recommender ingest just the appended rows with update_files. Checking only reads file sizes,
+# so a short interval costs almost nothing while the files do not change.
+# The Recommender is changed from the watcher thread, so code querying it from other threads has to hold
+# the same lock while it queries; a callback can instead hand the work to a thread of its own.
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks of the file sizes
+POLL_INTERVAL = 2.0
+
+
+class FileWatcher:
+    def __init__(self, recommender, interval=POLL_INTERVAL, on_update=None, on_error=None, lock=None):
+        """
+        Watches the files loaded by a Recommender. on_update(report) is called on the watcher thread after
+        appended rows were ingested, and on_error(exception) if an update failed (by default the error is
+        logged and watching goes on). Updates are applied while holding lock, a new lock by default.
+        """
+        self.recommender = recommender
+        self.interval = interval
+        self.on_update = on_update
+        self.on_error = on_error
+        self.lock = lock if lock is not None else threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Ingests the rows appended since the last check, if any; returns the update report or None."""
+        if not self.recommender.has_appended_data():
+            return None
+        with self.lock:
+            report = self.recommender.update_files()
+        if not any(key != 'total_seconds' for key in report):
+            return None  # Only a row still being written was appended
+        if self.on_update is not None:
+            self.on_update(report)
+        return report
+
+    def _run(self):
+        """Checks the files until stop is called."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as error:
+                if self.on_error is not None:
+                    self.on_error(error)
+                else:
+                    logger.exception("Could not update the loaded files")
+
+    def start(self):
+        """Starts watching on a daemon thread; returns the watcher so it can be created and started at once."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='file-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stops watching and waits for a running update to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
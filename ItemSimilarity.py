@@ -0,0 +1,194 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The ItemSimilarity class holds, for every item of an AssociationGraph, the k items
+# most similar to it. Two items are similar when they are associated with the same items: every item
+# is described by its row of association counts, and two rows are compared with the cosine of their
+# count vectors or the Jaccard index of the sets of associated IDs.
+# The similarities are computed ahead of time from the sparse matrix of the graph. Rows are split into
+# chunks of about the same amount of work, and every chunk is processed with NumPy: the two-hop paths
+# item -> associated item -> other item are expanded at once, equal pairs are added up and the best k
+# pairs of every row are kept. Chunks can be processed in parallel in separate processes; the matrix is
+# sent to every process once, when it starts, and each chunk task only names its range of rows.
+# The top-k lists are stored in compressed sparse row form, so looking up the similar items of an
+# item only reads its k entries. The model is a plain attribute of the Recommender, so it is
+# saved in and restored from snapshots together with the loaded data.
+
+import os
+
+import numpy as np
+
+# Metrics comparing the association rows of two items
+METRICS = ('cosine', 'jaccard')
+# Upper bound on the number of two-hop paths expanded at once in one chunk
+CHUNK_PATHS = 2_000_000
+
+
+# Matrix prepared by _prepare, set once in every worker process by _set_matrix
+_matrix = None
+
+
+def _prepare(indptr, indices, counts, metric):
+    """
+    Returns the arrays every chunk of a sparse association matrix needs: indptr, indices, the degree of
+    every row, the weight of every entry and, for the cosine, the norm of every row (None otherwise).
+    """
+    size = len(indptr) - 1
+    degrees = np.diff(indptr)
+    norms = None
+    if metric == 'cosine':
+        weights = counts.astype(np.float64)
+        row_of_entry = np.repeat(np.arange(size), degrees)
+        norms = np.sqrt(np.bincount(row_of_entry, weights=weights * weights, minlength=size))
+    else:
+        weights = np.ones(len(counts), dtype=np.float64)
+    return indptr, indices, degrees, weights, norms
+
+
+def _set_matrix(matrix):
+    """Keeps the prepared matrix in a worker process, so the chunk tasks do not have to carry it."""
+    global _matrix
+    _matrix = matrix
+
+
+def _chunk_top_k(start, stop, metric, k):
+    """Runs _two_hop_top_k on the matrix of the worker process."""
+    return _two_hop_top_k(_matrix, start, stop, metric, k)
+
+
+def _two_hop_top_k(matrix, start, stop, metric, k):
+    """
+    Computes the k most similar items of the rows start to stop-1 of a sparse association matrix
+    prepared by _prepare. Returns three arrays (rows, similar items, scores) ordered by row and then
+    by decreasing score; ties keep the order of the item numbers.
+    """
+    indptr, indices, degrees, weights, norms = matrix
+    size = len(indptr) - 1
+
+    # First hop: the items associated with each row of the chunk
+    first_start, first_stop = indptr[start], indptr[stop]
+    sources = np.repeat(np.arange(start, stop), degrees[start:stop])
+    middles = indices[first_start:first_stop]
+    first_weights = weights[first_start:first_stop]
+
+    # Second hop: the items associated with each of those, expanded into one flat array of entries
+    lengths = degrees[middles]
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32)
+    ends = np.cumsum(lengths)
+    entries = np.arange(total) - np.repeat(ends - lengths, lengths) + np.repeat(indptr[middles], lengths)
+    rows = np.repeat(sources, lengths)
+    others = indices[entries]
+    products = np.repeat(first_weights, lengths) * weights[entries]
+    keep = rows != others  # An item is not similar to itself
+    rows, others, products = rows[keep], others[keep], products[keep]
+    if not len(rows):
+        return np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32)
+
+    # Add up the products of equal (row, other) pairs: the dot product, or the size of the intersection
+    keys = (rows - start).astype(np.int64) * size + others
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    overlap = np.add.reduceat(products[order], starts)
+    rows = (keys[starts] // size + start).astype(np.int32)
+    others = (keys[starts] % size).astype(np.int32)
+    if metric == 'cosine':
+        scores = overlap / (norms[rows] * norms[others])
+    else:
+        scores = overlap / (degrees[rows] + degrees[others] - overlap)
+
+    # Keep the k best pairs of every row
+    order = np.lexsort((others, -scores, rows))
+    rows, others, scores = rows[order], others[order], scores[order]
+    row_starts = np.flatnonzero(np.concatenate(([True], rows[1:] != rows[:-1])))
+    ranks = np.arange(len(rows)) - np.repeat(row_starts, np.diff(np.append(row_starts, len(rows))))
+    keep = ranks < k
+    return rows[keep], others[keep], scores[keep].astype(np.float32)
+
+
+def _chunks(indptr, indices, limit=CHUNK_PATHS):
+    """Splits the rows into (start, stop) ranges whose number of two-hop paths stays around the limit."""
+    degrees = np.diff(indptr)
+    size = len(degrees)
+    # Number of two-hop paths starting at every row: the sum of the degrees of its associated items
+    paths = np.bincount(np.repeat(np.arange(size), degrees), weights=degrees[indices], minlength=size)
+    totals = np.cumsum(paths)
+    chunks = []
+    start = 0
+    while start < size:
+        done = totals[start - 1] if start else 0
+        # Every chunk holds at least one row, even if that row alone has more paths than the limit
+        stop = min(size, max(start + 1, int(np.searchsorted(totals, done + limit, side='right'))))
+        chunks.append((start, stop))
+        start = stop
+    return chunks
+
+
+class ItemSimilarity:
+    def __init__(self, names, indptr, indices, scores, metric, k):
+        self.metric = metric
+        self.k = k
+        self._names = names  # Item number -> ID
+        self._ids = {item_id: node for node, item_id in enumerate(names)}
+        self._indptr = indptr
+        self._indices = indices
+        self._scores = scores
+
+    @classmethod
+    def build(cls, graph, metric='cosine', k=20, max_workers=None, use_processes=None):
+        """
+        Computes the k most similar items of every item of an AssociationGraph with the given metric
+        ('cosine' or 'jaccard'). By default the chunks are processed in separate processes when the
+        machine has more than one core; max_workers limits the number of processes.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown similarity metric {metric!r}; use one of {', '.join(METRICS)}.")
+        names, indptr, indices, counts = graph.matrix()
+        size = len(names)
+        chunks = _chunks(indptr, indices) if size else []
+        if use_processes is None:
+            use_processes = (os.cpu_count() or 1) > 1
+        matrix = _prepare(indptr, indices, counts, metric)
+        if use_processes and len(chunks) > 1:
+            from concurrent.futures import ProcessPoolExecutor  # Slow to import, so only imported when used
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_set_matrix, initargs=(matrix,)) as pool:
+                futures = [pool.submit(_chunk_top_k, start, stop, metric, k) for start, stop in chunks]
+                # Results are collected in chunk order, so the rows stay sorted
+                parts = [future.result() for future in futures]
+        else:
+            parts = [_two_hop_top_k(matrix, start, stop, metric, k) for start, stop in chunks]
+
+        rows = np.concatenate([part[0] for part in parts]) if parts else np.zeros(0, np.int32)
+        similar = np.concatenate([part[1] for part in parts]) if parts else np.zeros(0, np.int32)
+        scores = np.concatenate([part[2] for part in parts]) if parts else np.zeros(0, np.float32)
+        top_indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=top_indptr[1:])
+        return cls(list(names), top_indptr, similar, scores, metric, k)
+
+    def neighbors(self, item_id, k=None, accept=None):
+        """
+        Returns up to k (ID, score) pairs of the items most similar to the given ID, from the most to the
+        least similar. If accept is given, only IDs for which accept(ID) is true are included.
+        """
+        node = self._ids.get(item_id)
+        if node is None or k == 0:
+            return []
+        result = []
+        for position in range(self._indptr[node], self._indptr[node + 1]):
+            name = self._names[self._indices[position]]
+            if accept is None or accept(name):
+                result.append((name, float(self._scores[position])))
+                if k is not None and len(result) >= k:
+                    break
+        return result
+
+    def nbytes(self):
+        """Returns the number of bytes used by the arrays of the top-k lists."""
+        return self._indptr.nbytes + self._indices.nbytes + self._scores.nbytes
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def __len__(self):
+        return len(self._names)
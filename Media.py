@@ -2,14 +2,53 @@
 # Date: 2024-05-04
 # Description: defines a Media class with three private attributes: ID, title, and average score.
 # It provides constructors and accessors and changers for each attribute.
+# The attributes are stored in __slots__ instead of a per-instance dictionary,
+# which keeps each record small when millions of them are loaded.
+# Fields holding several names are also split once with split_names and kept as tuples of names.
+
+import sys
+
+
+def split_names(names, separator):
+    """
+    Splits a field holding several names, such as the cast of a show, into a tuple of names.
+    Names are separated by the separator, surrounding spaces are removed and empty names are dropped.
+    Every name is interned, so a name repeated across many records is stored only once.
+    A tuple of names, as stored by an existing record, is returned unchanged, and a missing field
+    (None for the trailing columns of a short row) gives no names.
+    """
+    if isinstance(names, tuple):
+        return names
+    if not names:
+        return ()
+    return tuple(sys.intern(name) for name in map(str.strip, names.split(separator)) if name)
+
+
+# Tuples of names shared by all records holding the same names, see share_names
+_shared_names = {}
+
+
+def share_names(names):
+    """
+    Returns a single shared tuple for every equal tuple of names. Meant for fields with few distinct
+    combinations, such as genres, where most records would otherwise hold their own equal tuple.
+    """
+    return _shared_names.setdefault(names, names)
+
 
 class Media:
+    __slots__ = ('_id', '_title', '_avg_rating')
+
     def __init__(self, media_id, title, avg_rating):
         # Initialize the private member variables
         self._id = media_id
         self._title = title
         self._avg_rating = avg_rating
 
+    # Pickle as a constructor call, which is much faster than the default handling of slotted objects
+    def __reduce__(self):
+        return (self.__class__, (self._id, self._title, self._avg_rating))
+
     # Accessor (getter) for the ID
     def get_id(self):
         return self._id
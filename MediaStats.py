@@ -0,0 +1,210 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Statistics engine for movies, TV shows and books.
+# The values the statistics need are stored in columns with one entry per record, in load order:
+# numbers such as the duration in minutes, the number of seasons and the page count, and categories
+# such as the show type, the rating, the author and the publisher as small integer codes.
+# The columns are compact arrays that are viewed as NumPy arrays when statistics are requested, so
+# averages, distributions and most common values are computed with vectorized operations
+# (count_nonzero, bincount, unique) instead of Python loops over the records.
+# Directors, actors and genres hold several names per record; they are counted in running counters
+# that are updated as records are loaded and replaced.
+# The returned dictionaries are the same as the ones computed by scanning all records.
+
+from array import array
+from collections import Counter
+
+import numpy as np
+
+
+class Categories:
+    """Assigns a small integer code to every distinct value, in order of first appearance."""
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+
+def _store(column, position, value):
+    """Sets the value of a record in a column, appending it if the record is new."""
+    if position == len(column):
+        column.append(value)
+    else:
+        column[position] = value
+
+
+def _counts_in_order(codes):
+    """
+    Returns (code, count) pairs for the codes present in an array, ordered by the position
+    of their first occurrence, which is the order a dictionary filled by a scan would have.
+    """
+    present, first = np.unique(codes, return_index=True)
+    counts = np.bincount(codes)[present]
+    order = np.argsort(first, kind='stable')
+    return [(int(present[i]), int(counts[i])) for i in order]
+
+
+def _most_common_code(codes, categories):
+    """
+    Returns the most common (value, count) pair of an array of codes, or ("None", 0) if it is empty.
+    Like Counter.most_common, ties go to the value that appears first.
+    """
+    if not len(codes):
+        return ("None", 0)
+    present, first = np.unique(codes, return_index=True)
+    counts = np.bincount(codes)[present]
+    tied = np.flatnonzero(counts == counts.max())
+    best = tied[np.argmin(first[tied])]
+    return (categories.names[present[best]], int(counts[best]))
+
+
+def _most_common(counter):
+    """Returns the most common (value, count) pair of a counter, ignoring values whose count dropped to zero."""
+    value, count = counter.most_common(1)[0] if counter else ("None", 0)
+    return (value, count) if count > 0 else ("None", 0)
+
+
+def _movie_length(duration):
+    return int(duration.replace(' min', ''))
+
+
+def _tv_length(duration):
+    return int(duration.replace(' Seasons', '').replace(' Season', ''))
+
+
+# How the duration of each show type is turned into a number
+LENGTH_PARSERS = {'Movie': _movie_length, 'TV Show': _tv_length}
+
+
+class ShowStats:
+    def __init__(self):
+        self.types = Categories()
+        self.ratings = Categories()
+        # One entry per show, at the show's load position
+        self._type = array('i')
+        self._rating = array('i')
+        self._length = array('q')  # Duration in minutes for movies, number of seasons for TV shows
+        self._invalid = {}  # Load position -> duration that cannot be converted to a number
+        # Running counters of directors, actors and genres for each show type; values whose count
+        # dropped to zero are kept so every value keeps the position of its first appearance
+        self._names = {show_type: (Counter(), Counter(), Counter()) for show_type in LENGTH_PARSERS}
+
+    def _count_names(self, show, sign):
+        """Adds (sign=1) or removes (sign=-1) the directors, actors and genres of a show."""
+        counters = self._names.get(show.get_show_type())
+        if counters is None:
+            return
+        directors, actors, genres = counters
+        # The names were split once when the show was loaded
+        for name in show.get_director_list():
+            directors[name] += sign
+        for name in show.get_actor_list():
+            actors[name] += sign
+        for name in show.get_genre_list():
+            genres[name] += sign
+
+    def set(self, position, show, old=None):
+        """Stores the values of the show at the given load position, replacing the old show stored there."""
+        if old is not None:
+            self._count_names(old, -1)
+        self._count_names(show, 1)
+
+        parse = LENGTH_PARSERS.get(show.get_show_type())
+        length = 0
+        self._invalid.pop(position, None)
+        if parse is not None:
+            try:
+                length = parse(show.get_duration())
+            except ValueError:
+                self._invalid[position] = show.get_duration()
+        _store(self._type, position, self.types.code(show.get_show_type()))
+        _store(self._rating, position, self.ratings.code(show.get_rating()))
+        _store(self._length, position, length)
+
+    def rating_counts(self, show_type):
+        """Returns (rating, number of shows) pairs for the shows of a type, in order of first appearance."""
+        mask = np.frombuffer(self._type, dtype=np.intc) == self.types.codes.get(show_type, -1)
+        ratings = np.frombuffer(self._rating, dtype=np.intc)[mask]
+        return [(self.ratings.names[rating], n) for rating, n in _counts_in_order(ratings)]
+
+    def summary(self, show_type):
+        """
+        Returns the number of shows of a type, the total of their lengths, the share of each rating
+        as a formatted percentage and the counters of their directors, actors and genres.
+        """
+        code = self.types.codes.get(show_type, -1)
+        for position, duration in self._invalid.items():
+            if self._type[position] == code:
+                LENGTH_PARSERS[show_type](duration)  # Raises the same ValueError a full scan would
+        mask = np.frombuffer(self._type, dtype=np.intc) == code
+        count = int(np.count_nonzero(mask))
+        total = int(np.frombuffer(self._length, dtype=np.int64)[mask].sum())
+        percentages = {rating: f"{(n / count * 100):.2f}%" for rating, n in self.rating_counts(show_type)}
+        return count, total, percentages, self._names[show_type]
+
+    def movie_summary(self):
+        """Returns the movie statistics dictionary."""
+        count, total, ratings_percentages, (directors, actors, genres) = self.summary('Movie')
+        average_duration = total / count if count else 0
+        return {
+            'Average Duration': f"{average_duration:.2f} minutes",
+            'Ratings Distribution': ratings_percentages,
+            'Most Common Director': _most_common(directors),
+            'Most Common Actor': _most_common(actors),
+            'Most Common Genre': _most_common(genres)
+        }
+
+    def tv_summary(self):
+        """Returns the TV show statistics dictionary."""
+        count, total, ratings_percentages, (_, actors, genres) = self.summary('TV Show')
+        average_seasons = total / count if count else 0
+        return {
+            'Average Seasons': f"{average_seasons:.2f}",
+            'Ratings Distribution': ratings_percentages,
+            'Most Common Actor': _most_common(actors),
+            'Most Common Genre': _most_common(genres)
+        }
+
+
+class BookStats:
+    def __init__(self):
+        self.authors = Categories()
+        self.publishers = Categories()
+        # One entry per book, at the book's load position
+        self._pages = array('q')
+        self._author = array('i')
+        self._publisher = array('i')
+        self._invalid = {}  # Load position -> page count that cannot be converted to a number
+
+    def set(self, position, book, old=None):
+        """Stores the values of the book at the given load position, replacing the old book stored there."""
+        pages = 0
+        self._invalid.pop(position, None)
+        try:
+            pages = int(book.get_num_pages())
+        except ValueError:
+            self._invalid[position] = book.get_num_pages()
+        _store(self._pages, position, pages)
+        _store(self._author, position, self.authors.code(book.get_authors()))
+        _store(self._publisher, position, self.publishers.code(book.get_publisher()))
+
+    def summary(self):
+        """Returns the book statistics dictionary."""
+        for pages in self._invalid.values():
+            int(pages)  # Raises the same ValueError a full scan would
+        count = len(self._pages)
+        total_pages = int(np.frombuffer(self._pages, dtype=np.int64).sum())
+        average_pages = total_pages / count if count else 0
+        authors = np.frombuffer(self._author, dtype=np.intc)
+        publishers = np.frombuffer(self._publisher, dtype=np.intc)
+        return {
+            'Average Page Count': f"{average_pages:.2f} pages",
+            'Most Common Author': _most_common_code(authors, self.authors),
+            'Most Common Publisher': _most_common_code(publishers, self.publishers)
+        }
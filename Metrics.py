@@ -0,0 +1,151 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: A registry of per-method metrics for the Recommender: the number of calls and failures,
+# latency percentiles (p50, p95, p99) and maximum, the rows scanned and the size of the results.
+# Methods are measured by replacing them on one instance with a measuring wrapper, so an instance
+# without metrics runs the plain methods and pays nothing. Code deep inside a measured call reports
+# the rows it scanned with count_rows(), which only costs a lookup when nothing is being measured.
+# Percentiles are computed from the most recent calls of every method, so the memory stays bounded.
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+# Latencies kept per method for the percentiles
+SAMPLE_SIZE = 2048
+PERCENTILES = (50, 95, 99)
+
+# Rows scanned by the measured calls running on each thread, innermost call last
+_active = threading.local()
+
+
+def count_rows(rows):
+    """Adds to the rows scanned by the measured call running on this thread; does nothing outside measured calls."""
+    calls = getattr(_active, 'calls', None)
+    if calls:
+        calls[-1] += rows
+
+
+def result_size(result):
+    """
+    Returns the size of a result: the number of characters of text, the number of entries of a list or
+    dictionary, or the size of the first element of a (result, error) pair. Only lengths are read,
+    so measuring a large result costs nothing extra.
+    """
+    if isinstance(result, tuple) and result:
+        return result_size(result[0])
+    if isinstance(result, (str, list, dict, set)):
+        return len(result)
+    return 0
+
+
+def _percentile(ordered, percent):
+    """Returns the nearest-rank percentile of a sorted, non-empty list."""
+    rank = max(1, -(-len(ordered) * percent // 100))  # Rounded up
+    return ordered[rank - 1]
+
+
+class MethodMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows_scanned = 0
+        self.result_size = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)  # Latencies of the most recent calls, in seconds
+
+    def summary(self):
+        """Returns the metrics of the method as a dictionary of plain numbers, with latencies in milliseconds."""
+        ordered = sorted(self.samples)
+        summary = {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': self.total_seconds * 1000,
+            'mean_ms': self.total_seconds * 1000 / self.calls if self.calls else 0.0,
+            'max_ms': self.max_seconds * 1000,
+        }
+        for percent in PERCENTILES:
+            summary[f'p{percent}_ms'] = _percentile(ordered, percent) * 1000 if ordered else 0.0
+        summary['rows_scanned'] = self.rows_scanned
+        summary['result_size'] = self.result_size
+        return summary
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._methods = {}  # Method name -> MethodMetrics
+        self._lock = threading.Lock()  # Measured methods may run on several threads
+
+    def record(self, name, seconds, rows=0, size=0, failed=False):
+        """Records one call of a method."""
+        with self._lock:
+            metrics = self._methods.get(name)
+            if metrics is None:
+                metrics = self._methods[name] = MethodMetrics()
+            metrics.calls += 1
+            metrics.errors += failed
+            metrics.total_seconds += seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+            metrics.rows_scanned += rows
+            metrics.result_size += size
+            metrics.samples.append(seconds)
+
+    def summary(self, name=None):
+        """Returns the metrics of one method, or a dictionary of the metrics of every method called so far."""
+        with self._lock:
+            if name is not None:
+                metrics = self._methods.get(name)
+                return metrics.summary() if metrics is not None else MethodMetrics().summary()
+            return {method: metrics.summary() for method, metrics in sorted(self._methods.items())}
+
+    def reset(self):
+        """Forgets every recorded call."""
+        with self._lock:
+            self._methods.clear()
+
+    def to_json(self):
+        """Returns the metrics of every method as a JSON string."""
+        return json.dumps(self.summary(), indent=2)
+
+    def dump(self, path):
+        """Writes the metrics of every method to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.to_json())
+
+    def measure(self, name, method):
+        """Returns a wrapper of a function that records its calls under the given name."""
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            calls = getattr(_active, 'calls', None)
+            if calls is None:
+                calls = _active.calls = []
+            calls.append(0)
+            start = time.perf_counter()
+            result = None
+            failed = True
+            try:
+                result = method(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                seconds = time.perf_counter() - start
+                rows = calls.pop()
+                if calls:
+                    calls[-1] += rows  # The rows also count for the measured call that made this one
+                self.record(name, seconds, rows, result_size(result), failed)
+        return measured
+
+
+def instrument(instance, names, registry):
+    """Replaces the given methods of one instance with wrappers recording their calls in the registry."""
+    for name in names:
+        setattr(instance, name, registry.measure(name, getattr(type(instance), name).__get__(instance)))
+
+
+def uninstrument(instance, names):
+    """Removes the wrappers added by instrument, so the instance runs the plain methods again."""
+    for name in names:
+        vars(instance).pop(name, None)
@@ -0,0 +1,184 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Profiles single operations of the Recommender, such as a load or a search, with cProfile
+# and tracemalloc, and writes one report per call to a directory: the wall time and peak memory, the
+# functions ranked by cumulative and by own time, and the lines that allocated the most memory still
+# held when the call returned. The raw cProfile data is saved next to it (.prof) for tools like snakeviz.
+# Profiles can be taken from code with Profiler.run, from a Recommender with enable_profiling, or from
+# the command line, which loads the given files and runs the given queries under the profiler.
+#
+# Usage: python Profiler.py --output profiles --shows shows.csv --books books.csv --associations associations.csv \
+#            --search-shows Movie love --search-books war --recommend Movie "Love Queen" --stats --lists
+
+import argparse
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+# Number of functions and allocation sites listed in every report
+TOP_ENTRIES = 25
+# Frames kept per allocation; one is enough to rank the allocating lines
+TRACE_FRAMES = 1
+
+
+def _file_name(name):
+    """Returns an operation name usable in a file name."""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+
+
+def _describe_arguments(args, kwargs, limit=200):
+    """Returns a short description of the arguments of a profiled call."""
+    parts = [repr(arg) for arg in args] + [f"{key}={value!r}" for key, value in kwargs.items()]
+    text = ", ".join(parts)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class Profiler:
+    def __init__(self, directory, top=TOP_ENTRIES, methods=()):
+        """
+        Creates a profiler writing its reports to the given directory, which is created if needed;
+        top is the number of functions and allocation sites in every report, and methods the names of
+        the Recommender methods profiled while it is enabled there.
+        """
+        self.directory = directory
+        self.top = top
+        self.methods = tuple(methods)
+        self.reports = []  # Paths of the reports written so far, in order
+        self._calls = {}  # Operation name -> number of calls profiled
+        # Only one profiler can be active at a time, so profiled calls from several threads take turns
+        self._lock = threading.RLock()
+        self._running = threading.local()
+        os.makedirs(directory, exist_ok=True)
+
+    def run(self, name, function, *args, **kwargs):
+        """
+        Calls function(*args, **kwargs) under cProfile and tracemalloc, writes the report of the call
+        named after the operation and returns the result. A call made while another one is profiled on
+        the same thread runs unprofiled, as it already shows up in the outer report.
+        """
+        if getattr(self._running, 'active', False):
+            return function(*args, **kwargs)
+        with self._lock:
+            self._running.active = True
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start(TRACE_FRAMES)
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            before = tracemalloc.take_snapshot()
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            failed = None
+            try:
+                profile.enable()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    profile.disable()
+            except BaseException as error:
+                failed = error
+                raise
+            finally:
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] - start_memory
+                after = tracemalloc.take_snapshot()
+                if not tracing:
+                    tracemalloc.stop()
+                self._running.active = False
+                self._write(name, _describe_arguments(args, kwargs), profile, before, after, seconds, peak, failed)
+
+    def wrap(self, name, function):
+        """Returns a wrapper of a function that profiles every call under the given operation name."""
+        @functools.wraps(function)
+        def profiled(*args, **kwargs):
+            return self.run(name, function, *args, **kwargs)
+        return profiled
+
+    def _write(self, name, arguments, profile, before, after, seconds, peak, failed):
+        """Writes the text report and the raw profile of one call."""
+        number = self._calls[name] = self._calls.get(name, 0) + 1
+        base = os.path.join(self.directory, f"{_file_name(name)}-{number:03d}")
+        profile.dump_stats(base + '.prof')
+
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                   tracemalloc.Filter(False, '<frozen importlib._bootstrap>')]
+        growth = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), 'lineno')
+        growth = [stat for stat in growth if stat.size_diff > 0]
+        growth.sort(key=lambda stat: stat.size_diff, reverse=True)
+
+        report = io.StringIO()
+        report.write(f"Operation: {name}({arguments})\n")
+        if failed is not None:
+            report.write(f"Failed with: {failed!r}\n")
+        report.write(f"Wall time: {seconds * 1000:.2f} ms (profiling slows the call down)\n")
+        report.write(f"Peak memory above the start: {max(peak, 0) / 1024:.1f} KiB\n")
+        report.write(f"Memory allocated and still held: {sum(stat.size_diff for stat in growth) / 1024:.1f} KiB\n\n")
+        for order, title in (('cumulative', "Hotspots by cumulative time"), ('tottime', "Hotspots by own time")):
+            report.write(f"{title} (top {self.top})\n")
+            stats = pstats.Stats(profile, stream=report)
+            stats.strip_dirs().sort_stats(order).print_stats(self.top)
+        report.write(f"Top allocation sites still holding memory (top {self.top})\n")
+        for rank, stat in enumerate(growth[:self.top], start=1):
+            frame = stat.traceback[0]
+            report.write(f"{rank:>3}. {frame.filename}:{frame.lineno}  "
+                         f"{stat.size_diff / 1024:.1f} KiB in {stat.count_diff} blocks\n")
+        if not growth:
+            report.write("     None\n")
+
+        with open(base + '.txt', 'w', encoding='utf-8') as file:
+            file.write(report.getvalue())
+        self.reports.append(base + '.txt')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile loads and queries of the Recommender.")
+    parser.add_argument('--output', default='profiles', help="directory the reports are written to (default: %(default)s)")
+    parser.add_argument('--shows', help="show CSV file, loaded under the profiler")
+    parser.add_argument('--books', help="book CSV file, loaded under the profiler")
+    parser.add_argument('--associations', help="association CSV file, loaded under the profiler")
+    parser.add_argument('--workers', type=int, default=None, help="processes used to parse each file in chunks")
+    parser.add_argument('--search-shows', nargs=2, action='append', default=[], metavar=('TYPE', 'TITLE'),
+                        help="profile a show search by type and title (repeatable)")
+    parser.add_argument('--search-books', action='append', default=[], metavar='TITLE',
+                        help="profile a book search by title (repeatable)")
+    parser.add_argument('--recommend', nargs=2, action='append', default=[], metavar=('TYPE', 'TITLE'),
+                        help="profile the recommendations of a title (repeatable)")
+    parser.add_argument('--stats', action='store_true', help="profile the movie, TV show and book statistics")
+    parser.add_argument('--lists', action='store_true', help="profile the movie, TV show and book title lists")
+    parser.add_argument('--top', type=int, default=TOP_ENTRIES, help="functions and allocation sites per report")
+    args = parser.parse_args()
+    if not (args.shows or args.books or args.associations):
+        parser.error("give at least one data file")
+
+    from Recommender import Recommender
+    recommender = Recommender()
+    profiler = Profiler(args.output, args.top)
+    for kind in ('shows', 'books', 'associations'):
+        path = getattr(args, kind)
+        if path:
+            profiler.run(f'load_{kind}', getattr(recommender, f'load_{kind}'), path, workers=args.workers)
+    for show_type, title in args.search_shows:
+        profiler.run('search_tv_movies', recommender.search_tv_movies, show_type, title, '', '', '')
+    for title in args.search_books:
+        profiler.run('search_books', recommender.search_books, title, '', '')
+    for media_type, title in args.recommend:
+        profiler.run('get_recommendations', recommender.get_recommendations, media_type, title, warn=False)
+    if args.stats:
+        for name in ('get_movie_stats', 'get_tv_stats', 'get_book_stats'):
+            profiler.run(name, getattr(recommender, name))
+    if args.lists:
+        for name in ('get_movie_list', 'get_tv_list', 'get_book_list'):
+            profiler.run(name, getattr(recommender, name))
+    for path in profiler.reports:
+        print(path, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
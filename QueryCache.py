@@ -0,0 +1,70 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The QueryCache class remembers the results of recent queries of the Recommender,
+# such as searches, recommendations and statistics, so repeating a query does not compute it again.
+# It holds at most a fixed number of results and evicts the least recently used one when it is full.
+# Hits, misses and evictions are counted so the benefit of the cache can be measured.
+# The Recommender clears the cache whenever loaded data changes, so a result is never stale.
+
+import threading
+from collections import OrderedDict
+
+# Marks a missing entry, since None can be a cached result
+_MISSING = object()
+
+
+class QueryCache:
+    def __init__(self, maxsize=256):
+        """Creates an empty cache holding at most maxsize results; a maxsize of 0 disables caching."""
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # Key -> result, from the least to the most recently used
+        self._lock = threading.Lock()  # The GUI queries from the main thread and from its worker thread
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._generation = 0  # Increased by clear(), so results computed from older data are not stored
+
+    def get(self, key, compute):
+        """Returns the cached result for the key, calling compute() and caching its result on a miss."""
+        with self._lock:
+            result = self._entries.get(key, _MISSING)
+            if result is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+            generation = self._generation
+        # Computed outside the lock so a slow query does not block the other thread
+        result = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return result  # The data changed while the result was computed
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def clear(self):
+        """Forgets every cached result; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self):
+        """Returns the hit, miss and eviction counters together with the current and maximum size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
@@ -10,235 +10,903 @@
 # returning the results in neatly formatted columns. Finally,
 # they find books related to a given movie or TV show and vice versa, based on media type and title.
 
+import copy
 import csv
-from tkinter import filedialog, messagebox, Tk
+import io
+import os
+import sys
+import time
+from array import array
+from itertools import chain, islice
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from Book import Book
 from Show import Show
-from collections import Counter
+from SearchIndex import SearchIndex, TitleIndex
+from AssociationGraph import AssociationGraph
+from CsvChunks import split_records, open_range, read_range, read_header, last_record_end
+from ItemSimilarity import ItemSimilarity
+from QueryCache import QueryCache
+from Metrics import MetricsRegistry, count_rows, instrument, uninstrument
+from MediaStats import ShowStats, BookStats
+import Snapshot
+
+
+def _open_source(source):
+    """
+    Returns an open text file for the given source together with a flag telling the caller
+    whether it owns the file and has to close it. The source may be a path or an already open file.
+    """
+    if hasattr(source, 'read'):
+        return source, False
+    return open(source, newline='', encoding='utf-8'), True
+
+
+def _source_name(source):
+    """Returns a printable name for a path or a file object, used in load reports."""
+    if hasattr(source, 'read'):
+        return getattr(source, 'name', repr(source))
+    return os.fspath(source)
+
+
+# Number of rows parsed between two progress reports
+PROGRESS_INTERVAL = 10000
+
+
+def _progress_reporter(file, progress):
+    """
+    Returns a function that reports how much of the file has been read by calling progress(fraction),
+    or None if no progress callback was given. The fraction is None if the size of the file is unknown.
+    """
+    if progress is None:
+        return None
+    try:
+        size = os.fstat(file.fileno()).st_size
+        position = file.buffer.tell
+    except (AttributeError, OSError):
+        return lambda: progress(None)
+    return lambda: progress(min(1.0, position() / size) if size else None)
+
+
+def parse_books(source, progress=None):
+    """
+    Parses a book CSV file into a dictionary of Book objects keyed by book ID.
+    Returns the dictionary and the number of rows read. If given, progress(fraction) is called
+    regularly with the fraction of the file read so far; it may raise an exception to stop parsing.
+    """
+    books = {}
+    rows = 0
+    file, owned = _open_source(source)
+    try:
+        report = _progress_reporter(file, progress)
+        reader = csv.DictReader(file, restval='')  # Columns missing from a short row are read as empty
+        for row in reader:
+            # Fields with few distinct values are interned so equal values share one string
+            book = Book(row['bookID'], row['title'], sys.intern(row['average_rating']), row['authors'],
+                        row['isbn'], row['isbn13'], sys.intern(row['language_code']), sys.intern(row['num_pages']),
+                        row['ratings_count'], sys.intern(row['publication_date']), sys.intern(row['publisher']))
+            books[book.get_id()] = book  # Later rows with the same ID replace earlier ones
+            rows += 1
+            if report is not None and rows % PROGRESS_INTERVAL == 0:
+                report()
+    finally:
+        if owned:
+            file.close()
+    return books, rows
+
+
+def parse_shows(source, progress=None):
+    """
+    Parses a show CSV file into a dictionary of Show objects keyed by show ID.
+    Returns the dictionary and the number of rows read, reporting progress like parse_books.
+    """
+    shows = {}
+    rows = 0
+    file, owned = _open_source(source)
+    try:
+        report = _progress_reporter(file, progress)
+        reader = csv.DictReader(file, restval='')  # Columns missing from a short row are read as empty
+        for row in reader:
+            # Fields with few distinct values are interned so equal values share one string
+            show = Show(row['show_id'], sys.intern(row['type']), row['title'], row['director'],
+                        row['cast'], sys.intern(row['average_rating']), sys.intern(row['country']), sys.intern(row['date_added']),
+                        sys.intern(row['release_year']), sys.intern(row['rating']), sys.intern(row['duration']),
+                        sys.intern(row['listed_in']), row['description'])
+            shows[show.get_id()] = show
+            rows += 1
+            if report is not None and rows % PROGRESS_INTERVAL == 0:
+                report()
+    finally:
+        if owned:
+            file.close()
+    return shows, rows
+
+
+def _add_csv_pairs(reader, ids, nodes, report):
+    """
+    Reads association rows with the csv module, adding the row numbers of both IDs of every row
+    with exactly two fields to nodes. Returns the number of rows read.
+    """
+    rows = 0
+    for row in reader:
+        if len(row) == 2:
+            nodes.append(ids.setdefault(row[0], len(ids)))
+            nodes.append(ids.setdefault(row[1], len(ids)))
+        rows += 1
+        if report is not None and rows % PROGRESS_INTERVAL == 0:
+            report()
+    return rows
+
+
+# Characters of association rows read at once
+ASSOCIATION_BLOCK = 1024 * 1024
+
+
+def parse_associations(source, progress=None):
+    """
+    Parses an association file into an AssociationGraph counting the associations between two IDs,
+    managing both direct and reverse associations. Returns the graph and the number of rows read,
+    reporting progress like parse_books. Rows that do not hold exactly two IDs are skipped.
+    Every ID is given a dense row number as it is first seen and the row numbers of all associations
+    are collected in one compact array, which the graph turns into its sparse matrix in bulk.
+    """
+    ids = {}  # ID -> row number, in order of first appearance
+    nodes = array('i')  # Row numbers of the two IDs of every association, one after the other
+    rows = 0
+    file, owned = _open_source(source)
+    try:
+        report = _progress_reporter(file, progress)
+        while True:
+            lines = file.readlines(ASSOCIATION_BLOCK)
+            if not lines:
+                break
+            if any('"' in line for line in lines):
+                # Quoted IDs may even span lines, so the csv module reads the rest of the file
+                rows += _add_csv_pairs(csv.reader(chain(lines, file)), ids, nodes, report)
+                break
+            # Without quotes, a row is simply its line split on commas
+            for line in lines:
+                row = line.rstrip('\r\n').split(',')
+                if len(row) == 2:
+                    nodes.append(ids.setdefault(row[0], len(ids)))
+                    nodes.append(ids.setdefault(row[1], len(ids)))
+            rows += len(lines)
+            if report is not None:
+                report()
+    finally:
+        if owned:
+            file.close()
+    return AssociationGraph.from_pairs(ids, nodes), rows
+
+
+# Parser used for each kind of data file, in the order the files are merged after a parallel load
+PARSERS = {
+    'shows': parse_shows,
+    'books': parse_books,
+    'associations': parse_associations,
+}
+
+# Smallest byte range worth parsing in a separate process
+MIN_CHUNK_BYTES = 1024 * 1024
+
+
+def _parse_range(kind, path, header, start, end):
+    """Parses the records between two offsets of a file, read after the header row of the file."""
+    text = (header + read_range(path, start, end)).decode('utf-8')
+    return PARSERS[kind](io.StringIO(text, newline=''))
+
+
+def parse_in_chunks(kind, path, workers, progress=None, end=None):
+    """
+    Parses a file of the given kind on several processes. The file is split into byte ranges ending on
+    record boundaries (quoted line breaks included), every range is parsed in its own process and the
+    results are merged in file order, so later rows with the same ID still replace earlier ones and
+    the records keep the order of a sequential parse. Files too small to split are parsed directly.
+    Only the part of the file before the end offset, by default its current size, is parsed; the caller
+    records the same offset as ingested, so rows appended meanwhile are neither lost nor read twice.
+    Returns the records and the number of rows read, reporting progress per merged range.
+    """
+    if end is None:
+        end = os.path.getsize(path)
+    header, ranges = split_records(path, workers, MIN_CHUNK_BYTES, has_header=kind != 'associations', end=end)
+    if len(ranges) <= 1:
+        with open_range(path, end) as file:
+            return PARSERS[kind](file, progress)
+    # The process pool is only imported when it is used, as it is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+    merged = AssociationGraph() if kind == 'associations' else {}
+    rows = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_parse_range, kind, path, header, start, end) for start, end in ranges]
+        try:
+            for number, future in enumerate(futures, start=1):
+                records, count = future.result()
+                merged.update(records)
+                rows += count
+                if progress is not None:
+                    progress(number / len(futures))
+        except BaseException:
+            # Do not start the remaining ranges when parsing fails or is cancelled
+            for future in futures:
+                future.cancel()
+            raise
+    return merged, rows
+
+
+# Fields kept in the search indexes, with the getter returning the text of each
+SHOW_SEARCH_FIELDS = {'title': Show.get_title, 'director': Show.get_directors,
+                      'actor': Show.get_actors, 'genre': Show.get_genres}
+BOOK_SEARCH_FIELDS = {'title': Book.get_title, 'author': Book.get_authors, 'publisher': Book.get_publisher}
+
+
+# Separator between the columns of the title lists, and the second column of each list
+LIST_SEPARATOR = "\t" * 12
+LIST_COLUMNS = {
+    'Movie': ('Runtime', Show.get_duration),
+    'TV Show': ('Seasons', Show.get_duration),
+    'Book': ('Authors', Book.get_authors),
+}
+
+# Number of query results kept by the query cache of a Recommender
+QUERY_CACHE_SIZE = 256
+# Public methods measured once metrics are enabled, and that can be profiled
+INSTRUMENTED_METHODS = ('load_books', 'load_shows', 'load_associations', 'load_files', 'update_files',
+                        'get_movie_list', 'get_tv_list', 'get_book_list', 'get_list_rows',
+                        'get_movie_stats', 'get_tv_stats', 'get_book_stats', 'get_rating_distribution',
+                        'search_tv_movies', 'search_books', 'get_recommendations', 'get_batch_recommendations')
+
+
+def _timed_parse(kind, source, progress=None, workers=None):
+    """
+    Runs the parser for the given kind of file and returns its records and row count, the number of bytes
+    of a file path that were parsed (None for an open file) and the elapsed time.
+    With more than one worker, a file given by its path is parsed in chunks on that many processes.
+    An association file given by its path is only parsed up to its last complete row: an association is
+    counted as soon as it is read, so a last row that may still be being written is left for update_files.
+    """
+    start = time.perf_counter()
+    end = None
+    if hasattr(source, 'read'):
+        records, rows = PARSERS[kind](source, progress)
+        return records, rows, end, time.perf_counter() - start
+    if kind == 'associations':
+        end = last_record_end(source, 0)
+    if workers is not None and workers > 1:
+        if end is None:
+            end = os.path.getsize(source)  # The file is split and parsed as it is now, even if it grows meanwhile
+        records, rows = parse_in_chunks(kind, source, workers, progress, end)
+    elif end is not None:
+        with open_range(source, end) as file:
+            records, rows = PARSERS[kind](file, progress)
+    else:
+        with open(source, newline='', encoding='utf-8') as file:
+            records, rows = PARSERS[kind](file, progress)
+            end = file.buffer.tell()  # The parser read up to the end of the file as it was then
+    return records, rows, end, time.perf_counter() - start
+
 
 class Recommender:
-    def __init__(self):
+    # Attributes describing the current run rather than the loaded data, left out of snapshots
+    TRANSIENT_ATTRIBUTES = ('load_report', '_last_searches', '_query_cache', 'metrics', 'profiler') + INSTRUMENTED_METHODS
+
+    def __init__(self, cache_size=QUERY_CACHE_SIZE):
+        """Creates an empty recommender; cache_size bounds the number of cached query results (0 disables the cache)."""
         self.books = {}
         self.shows = {}
-        self.associations = {}
+        self.associations = AssociationGraph()  # Sparse matrix of association counts between IDs
+        # Most similar items of every associated item, built on request by build_similarity
+        self.similarity = None
+        # True once associations were appended by update_files after the similarity model was built
+        self.similarity_stale = False
         self.movies = {}  # Initialize as an empty dictionary or appropriate data structure
-        self.shows = {}
+        self.load_report = {}  # Row counts and timings of the most recent load, keyed by file kind
+        # (kind, path) of every file loaded so far, or None once data was loaded from an open file
+        self._sources = []
+        # Absolute path -> kind, offset of the end of the last complete record ingested, bytes of an
+        # incomplete last record seen after it, and rows read, for every file loaded from a path,
+        # so update_files can parse just the rows appended since
+        self._ingested = {}
+        # Inverted indexes used by the searches, one for the shows of every type and one for books,
+        # whose rows are the positions in self._show_positions and self._book_positions
+        self._show_index = SearchIndex(SHOW_SEARCH_FIELDS)
+        self._book_index = SearchIndex(BOOK_SEARCH_FIELDS)
+        # Title indexes used to find the seed titles of recommendations, keyed by 'Movie', 'TV Show' and 'Book'
+        self._title_indexes = {'Book': TitleIndex(self._book_index)}
+        # Statistics kept up to date as records are loaded
+        self._show_stats = ShowStats()
+        self._book_stats = BookStats()
+        # IDs of the books and of each show type in load order, used by the paged title lists,
+        # and the show types whose lists must be rebuilt because a show changed its type
+        self._list_ids = {'Book': []}
+        self._stale_lists = set()
+        # Position of every ID in self.shows / self.books, used to return index results in load order
+        self._show_positions = {}
+        self._book_positions = {}
+        # Criteria and matching IDs of the last show and book search, keyed by 'shows' and 'books',
+        # so a query that only narrows the previous one filters its results instead of the whole catalog
+        self._last_searches = {}
+        # Results of recent searches, recommendations and statistics, cleared whenever data is loaded
+        self._query_cache = QueryCache(cache_size)
+        # Registry of per-method metrics while enable_metrics is in effect, otherwise None
+        self.metrics = None
+        # Profiler writing a report for every call of the chosen methods while enable_profiling is in effect
+        self.profiler = None
 
-
-    def load_books(self):
+    def _ask_for_file(self, description):
         """
-        Load book data from a CSV file into a dictionary of Book objects.
-        Initializes a file dialog to select a book file, repeatedly prompts
-        until a valid file is selected, reads the file line by line, creates a Book object
-        for each line, and stores it in a dictionary using the book ID as the key.
+        Opens a file dialog asking for the given kind of file and repeatedly prompts
+        until a file is selected. Used when a load method is called without a source.
         """
+        # Tkinter is only imported when a dialog is needed, so the recommender also runs without Tk
+        from tkinter import filedialog, messagebox, Tk
         root = Tk()
         root.withdraw()  # Hides the main window
-        file_path = filedialog.askopenfilename(title="Select a book file")
+        file_path = filedialog.askopenfilename(title=f"Select {description}")
         while not file_path:
-            messagebox.showerror("Error", "Please select a book file.")
-            file_path = filedialog.askopenfilename(title="Select a book file")
+            messagebox.showerror("Error", f"Please select {description}.")
+            file_path = filedialog.askopenfilename(title=f"Select {description}")
+        root.destroy()
+        return file_path
 
-        with open(file_path, newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                book = Book(row['bookID'], row['title'], row['average_rating'], row['authors'],
-                            row['isbn'], row['isbn13'], row['language_code'], row['num_pages'],
-                            row['ratings_count'], row['publication_date'], row['publisher'])
-                self.books[book.get_id()] = book # Store the Book object in the dictionary
+    def _add_books(self, books):
+        """Stores parsed Book objects, replacing any existing book with the same ID, and updates the search index."""
+        for book_id, book in books.items():
+            old = self.books.get(book_id)
+            if old is None:
+                self._book_positions[book_id] = self._book_index.add(book)
+                self._list_ids['Book'].append(book_id)
+            else:
+                self._book_index.replace(self._book_positions[book_id], book)
+            self._book_stats.set(self._book_positions[book_id], book, old)
+            self._title_indexes['Book'].add(book_id, book.get_title())
+            self.books[book_id] = book
 
-        root.destroy()
+    def _add_shows(self, shows):
+        """Stores parsed Show objects, replacing any existing show with the same ID, and updates the search indexes."""
+        for show_id, show in shows.items():
+            old = self.shows.get(show_id)
+            if old is None:
+                self._show_positions[show_id] = self._show_index.add(show)
+                self._list_ids.setdefault(show.get_show_type(), []).append(show_id)
+            else:
+                if old.get_show_type() != show.get_show_type():
+                    self._stale_lists.update((old.get_show_type(), show.get_show_type()))
+                self._show_index.replace(self._show_positions[show_id], show)
+                self._title_indexes[old.get_show_type()].remove(show_id)
+            self._show_stats.set(self._show_positions[show_id], show, old)
+            show_type = show.get_show_type()
+            if show_type not in self._title_indexes:
+                self._title_indexes[show_type] = TitleIndex(self._show_index)
+            self._title_indexes[show_type].add(show_id, show.get_title())
+            self.shows[show_id] = show
 
-    def load_shows(self):
+    def _add_associations(self, associations, keep_similarity=False):
         """
-        Loads show data from a CSV file into a dictionary of Show objects.
+        Adds parsed association counts to the existing counts. The similarity model no longer matches them,
+        so it is dropped, or with keep_similarity kept and marked as stale until it is built again.
         """
-        root = Tk()
-        root.withdraw()
-        file_path = filedialog.askopenfilename(title="Select a show file")
-        while not file_path:
-            messagebox.showerror("Error", "Please select a show file.")
-            file_path = filedialog.askopenfilename(title="Select a show file")
-
-        with open(file_path, newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                show = Show(row['show_id'], row['type'], row['title'], row['director'],
-                            row['cast'], row['average_rating'], row['country'], row['date_added'],
-                            row['release_year'], row['rating'], row['duration'],
-                            row['listed_in'], row['description'])
-                self.shows[show.get_id()] = show # Store the Show object in the dictionary with its ID as the key
-        root.destroy()
+        self.associations.update(associations)
+        if keep_similarity and self.similarity is not None:
+            self.similarity_stale = True
+        else:
+            self.similarity = None
+            self.similarity_stale = False
+
+    def _store(self, kind, records, keep_similarity=False):
+        """Stores the records parsed from a file of the given kind; keep_similarity is passed to _add_associations."""
+        # Results of earlier queries no longer reflect the data
+        self._last_searches.clear()
+        self._query_cache.clear()
+        if kind == 'books':
+            self._add_books(records)
+        elif kind == 'shows':
+            self._add_shows(records)
+        else:
+            self._add_associations(records, keep_similarity)
 
-    def load_associations(self):
+    def _record_source(self, kind, source):
+        """Remembers a loaded file so snapshots can be checked against it; open files cannot be checked."""
+        if hasattr(source, 'read'):
+            self._sources = None
+        elif self._sources is not None:
+            self._sources.append((kind, os.path.abspath(source)))
+
+    def _record_ingested(self, kind, source, end, rows):
         """
-        Loads data from an association file into a dictionary to maintain a count of associations
-        between two IDs, managing both direct and reverse associations.
+        Remembers how much of a file given by its path was loaded, for update_files. A load of shows or books
+        parses the whole file, including a last record without a line break that may still be being written,
+        so the offset is the end of the last complete record and the rest is remembered as partial.
         """
-        root = Tk()
-        root.withdraw()
-        file_path = filedialog.askopenfilename(title="Select an association file")
-        while not file_path:
-            messagebox.showerror("Error", "Please select an association file.")
-            file_path = filedialog.askopenfilename(title="Select an association file")
-
-        with open(file_path, newline='', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                id1, id2 = row
-                # Update dictionary for direct association
-                if id1 not in self.associations:
-                    self.associations[id1] = {} # Initialize a new dictionary if id1 is not found
-                if id2 not in self.associations[id1]:
-                    self.associations[id1][id2] = 0
-                self.associations[id1][id2] += 1
-
-                # Repeat for reverse association
-                if id2 not in self.associations:
-                    self.associations[id2] = {}
-                if id1 not in self.associations[id2]:
-                    self.associations[id2][id1] = 0
-                self.associations[id2][id1] += 1
-        root.destroy() # Destroy the root window after loading the associations
+        if end is not None:
+            path = os.path.abspath(source)
+            offset = last_record_end(path, 0, end)
+            self._ingested[path] = {'kind': kind, 'offset': offset, 'partial': end - offset, 'rows': rows}
+
+    def _load(self, kind, source, progress=None, workers=None):
+        """
+        Parses a single file of the given kind, stores its records and records the row count and timing.
+        The records are only stored once the whole file is parsed, so a progress callback that raises
+        an exception to cancel the load leaves the loaded data unchanged.
+        """
+        records, rows, end, seconds = _timed_parse(kind, source, progress, workers)
+        count_rows(rows)
+        self._store(kind, records)
+        self._record_source(kind, source)
+        self._record_ingested(kind, source, end, rows)
+        self.load_report = {kind: self._file_report(kind, source, records, rows, seconds)}
+        return self.load_report
+
+    def _file_report(self, kind, source, records, rows, seconds):
+        """
+        Returns the load report of one file: its name, the rows read and the seconds taken.
+        Association files also get the integrity report of the parsed associations, including
+        the number of malformed rows that did not hold exactly two IDs and were skipped.
+        """
+        report = {'source': _source_name(source), 'rows': rows, 'seconds': seconds}
+        if kind == 'associations':
+            report['integrity'] = {'malformed_rows': rows - records.pair_count(), **self.check_associations(records)}
+        return report
+
+    def check_associations(self, graph=None, examples=10):
+        """
+        Returns an integrity report of an association graph, by default the loaded one: the number of
+        associations, of self-loops (an ID associated with itself) and of unknown IDs that are neither
+        a loaded book nor a loaded show, with the first few unknown IDs as examples.
+        Recommendations skip unknown IDs, so many of them usually mean a missing or outdated data file.
+        """
+        graph = self.associations if graph is None else graph
+        unknown = [item_id for item_id in graph if item_id not in self.books and item_id not in self.shows]
+        return {
+            'associations': graph.pair_count(),
+            'self_loops': graph.self_loop_count(),
+            'unknown_ids': len(unknown),
+            'unknown_id_examples': unknown[:examples],
+        }
+
+    def load_books(self, source=None, progress=None, workers=None):
+        """
+        Load book data from a CSV file into a dictionary of Book objects.
+        The source can be a file path or an open file; without a source a file dialog
+        repeatedly prompts until a book file is selected. Each row becomes a Book object
+        stored in a dictionary using the book ID as the key.
+        Returns a report with the number of rows read and the time taken.
+        If given, progress(fraction) is called regularly with the fraction of the file read so far.
+        With workers greater than one, a file path is split into chunks parsed on that many processes,
+        for example workers=os.cpu_count() for very large files.
+        """
+        if source is None:
+            source = self._ask_for_file("a book file")
+        return self._load('books', source, progress, workers)
+
+    def load_shows(self, source=None, progress=None, workers=None):
+        """
+        Loads show data from a CSV file (a path, an open file, or a file chosen in a dialog)
+        into a dictionary of Show objects.
+        """
+        if source is None:
+            source = self._ask_for_file("a show file")
+        return self._load('shows', source, progress, workers)
+
+    def load_associations(self, source=None, progress=None, workers=None):
+        """
+        Loads data from an association file (a path, an open file, or a file chosen in a dialog)
+        into a dictionary to maintain a count of associations between two IDs,
+        managing both direct and reverse associations.
+        """
+        if source is None:
+            source = self._ask_for_file("an association file")
+        return self._load('associations', source, progress, workers)
+
+    def load_files(self, books=None, shows=None, associations=None, max_workers=None, use_processes=None,
+                   snapshot=None, progress=None):
+        """
+        Loads any combination of book, show and association files at the same time on a worker pool.
+        Sources may be paths or open files. By default separate processes are used when the machine
+        has more than one core, so the files are parsed in parallel; open file objects cannot be sent
+        to other processes, so threads are used whenever one is given. Returns a report with the rows
+        read and the time taken for each file plus the total wall time.
+        With a snapshot path, an empty recommender is restored from that snapshot if it was built from
+        the same, unchanged files; otherwise the files are parsed and the snapshot is written afterwards.
+        A snapshot replaces all the data, so it cannot be used once the recommender holds any.
+        If given, progress(fraction) is called with the fraction of the files parsed so far. It may raise an
+        exception to stop the load; nothing is stored before every file is parsed, so the data loaded
+        before stays unchanged when a load is stopped or a file cannot be parsed.
+        """
+        sources = {kind: source for kind, source in
+                   (('shows', shows), ('books', books), ('associations', associations)) if source is not None}
+        if not sources:
+            return {}
+        if snapshot is not None:
+            if any(hasattr(source, 'read') for source in sources.values()):
+                raise ValueError("Snapshots can only be used when loading from file paths.")
+            if self.books or self.shows or len(self.associations):
+                raise ValueError("Snapshots can only be used when loading into an empty recommender.")
+            snapshot_sources = [(kind, sources[kind]) for kind in PARSERS if kind in sources]
+            if self._restore_snapshot(snapshot, snapshot_sources):
+                return self.load_report
+            # The files are signed before they are parsed, so rows appended during the parse invalidate the snapshot
+            signed_sources = Snapshot.sign_sources(snapshot_sources)
+        if use_processes is None:
+            use_processes = (os.cpu_count() or 1) > 1
+        if any(hasattr(source, 'read') for source in sources.values()):
+            use_processes = False
+        if use_processes and len(sources) > 1:
+            from concurrent.futures import ProcessPoolExecutor as pool_class
+        else:
+            pool_class = ThreadPoolExecutor
+
+        start = time.perf_counter()
+        report = {}
+        with pool_class(max_workers=max_workers or len(sources)) as pool:
+            futures = {kind: pool.submit(_timed_parse, kind, source) for kind, source in sources.items()}
+            pending = set(futures.values())
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if progress is not None:
+                    progress((len(futures) - len(pending)) / len(futures))
+            # Merge in a fixed order so the result does not depend on which file finishes first
+            parsed = {kind: futures[kind].result() for kind in PARSERS if kind in futures}
+        for kind, (records, rows, end, seconds) in parsed.items():
+            count_rows(rows)
+            self._store(kind, records)
+            self._record_source(kind, sources[kind])
+            self._record_ingested(kind, sources[kind], end, rows)
+            report[kind] = self._file_report(kind, sources[kind], records, rows, seconds)
+        if snapshot is not None:
+            Snapshot.save_snapshot(snapshot, self.__getstate__(), signed_sources)
+        report['total_seconds'] = time.perf_counter() - start
+        self.load_report = report
+        return report
+
+    def has_appended_data(self):
+        """Returns True if any file loaded from a path has grown since it was last ingested; only the file sizes are read."""
+        for path, ingested in self._ingested.items():
+            try:
+                if os.path.getsize(path) != ingested['offset'] + ingested['partial']:
+                    return True
+            except OSError:
+                continue
+        return False
+
+    def update_files(self):
+        """
+        Ingests the rows appended to the loaded files since they were loaded or last updated, without parsing
+        the rest of the files again. Only complete records are read, so a row that is still being written
+        is picked up by a later update. New and changed shows and books replace the stored ones and the
+        appended associations are added to the counts, updating the statistics and indexes like a load.
+        A last show or book that was incomplete when the file was loaded is read again once it is complete,
+        which replaces the partial one; a last association row is only ever read once it is complete.
+        Files are expected to grow only by appending whole rows; a file that got shorter is reported with
+        an error and left as it is, as it has to be loaded again. A similarity model is kept when associations
+        are appended, but marked as stale (similarity_stale) until build_similarity is called again.
+        Returns a report with the rows and bytes ingested per updated file and the total time; it also becomes
+        load_report unless nothing was ingested, for example when only a row still being written grew.
+        """
+        start = time.perf_counter()
+        report = {}
+        # Shows and books are updated before associations, in the order a load merges them
+        order = list(PARSERS)
+        for path, ingested in sorted(self._ingested.items(), key=lambda item: order.index(item[1]['kind'])):
+            kind, offset = ingested['kind'], ingested['offset']
+            try:
+                size = os.path.getsize(path)
+            except OSError as error:
+                report[path] = {'kind': kind, 'error': str(error)}
+                continue
+            if size < offset:
+                report[path] = {'kind': kind, 'error': "The file got shorter since it was loaded; load it again."}
+                continue
+            end = last_record_end(path, offset, size)
+            if end == offset:
+                # Only a row still being written was appended; remember its length so it is not checked again
+                # before it grows further
+                ingested['partial'] = size - offset
+                continue
+            parse_start = time.perf_counter()
+            header = read_header(path) if kind != 'associations' else b''
+            records, rows = _parse_range(kind, path, header, offset, end)
+            count_rows(rows)
+            # A few appended associations barely change the similarities, so two-hop recommendations stay on
+            self._store(kind, records, keep_similarity=True)
+            ingested.update(offset=end, partial=size - end)
+            ingested['rows'] += rows
+            file_report = self._file_report(kind, path, records, rows, time.perf_counter() - parse_start)
+            file_report.update({'bytes': end - offset, 'total_rows': ingested['rows']})
+            if kind == 'associations' and self.similarity is not None:
+                file_report['similarity_stale'] = True  # Rebuild it with build_similarity to include the new rows
+            report[path] = file_report
+        report['total_seconds'] = time.perf_counter() - start
+        if len(report) > 1:
+            self.load_report = report  # An update that ingested nothing keeps the report of the last real one
+        return report
+
+    def __getstate__(self):
+        """Returns the loaded data and indexes, without the attributes that only describe the current run."""
+        return {name: value for name, value in vars(self).items() if name not in self.TRANSIENT_ATTRIBUTES}
+
+    def __setstate__(self, state):
+        """Restores the loaded data and indexes from a state returned by __getstate__."""
+        cache = vars(self).get('_query_cache')
+        metrics, profiler = vars(self).get('metrics'), vars(self).get('profiler')
+        self.__init__(cache.maxsize if cache is not None else QUERY_CACHE_SIZE)  # Also starts with an empty cache
+        vars(self).update(state)
+        # Restoring a snapshot keeps measuring and profiling as before
+        self.metrics, self.profiler = metrics, profiler
+        self._wrap_methods()
+
+    def save_snapshot(self, snapshot_path):
+        """
+        Writes the loaded records, associations and indexes to a binary snapshot file
+        that remembers the size, modification time and content hash of every loaded file.
+        """
+        if self._sources is None:
+            raise ValueError("Data loaded from open files cannot be saved to a snapshot.")
+        Snapshot.save_snapshot(snapshot_path, self.__getstate__(), Snapshot.sign_sources(self._sources))
+
+    def load_snapshot(self, snapshot_path, check_content=True):
+        """
+        Replaces the loaded data with the content of a snapshot file. Returns False and keeps the current
+        data if the snapshot is missing or any file it was built from has changed since.
+        With check_content=False only the size and modification time of the files are compared.
+        """
+        return self._restore_snapshot(snapshot_path, None, check_content)
+
+    def _restore_snapshot(self, snapshot_path, sources, check_content=True):
+        """Restores the state from a snapshot built from the given (kind, path) sources; returns True on success."""
+        start = time.perf_counter()
+        state = Snapshot.load_snapshot(snapshot_path, sources, check_content)
+        if state is None:
+            return False
+        self.__setstate__(state)
+        self.load_report = {'snapshot': os.fspath(snapshot_path), 'total_seconds': time.perf_counter() - start}
+        return True
+
+    def prepare(self):
+        """
+        Builds every structure that is otherwise built on first use: the sparse association matrix,
+        the search indexes, the sorted title indexes and the title lists of shows that changed type.
+        Afterwards queries only read the data (apart from the thread-safe query cache),
+        so they can run on several threads at once.
+        """
+        self.associations.matrix()
+        self._show_index.prepare()
+        self._book_index.prepare()
+        for index in self._title_indexes.values():
+            index.prepare()
+        for media_type in list(self._stale_lists):
+            self._ordered_ids(media_type)
+
+    def _ordered_ids(self, media_type):
+        """Returns the IDs of the Books, or of the shows of one type, in load order."""
+        if media_type in self._stale_lists:
+            self._list_ids[media_type] = [show_id for show_id, show in self.shows.items()
+                                          if show.get_show_type() == media_type]
+            self._stale_lists.discard(media_type)
+        return self._list_ids.get(media_type, [])
+
+    def get_list_header(self, media_type):
+        """Returns the header line of the title list of 'Movie', 'TV Show' or 'Book'."""
+        return f"Title{LIST_SEPARATOR}{LIST_COLUMNS[media_type][0]}"
+
+    def get_list_count(self, media_type):
+        """Returns the number of rows in the title list of 'Movie', 'TV Show' or 'Book'."""
+        return len(self._ordered_ids(media_type))
+
+    def iter_list_rows(self, media_type, offset=0, limit=None):
+        """
+        Lazily yields the formatted rows of the title list of 'Movie', 'TV Show' or 'Book', starting at the
+        given offset and yielding at most limit rows, without formatting any other row.
+        Each row is the title and the runtime, seasons or authors, separated by tabs.
+        """
+        ids = self._ordered_ids(media_type)
+        records = self.books if media_type == 'Book' else self.shows
+        getter = LIST_COLUMNS[media_type][1]
+        stop = None if limit is None else offset + limit
+        count_rows(max(0, min(len(ids), len(ids) if stop is None else stop) - offset))  # Without copying the IDs
+        for record_id in islice(ids, offset, stop):
+            record = records[record_id]
+            yield f"{record.get_title()}{LIST_SEPARATOR}{getter(record)}"
+
+    def get_list_rows(self, media_type, offset=0, limit=None):
+        """
+        Returns the formatted rows of the title list of 'Movie', 'TV Show' or 'Book', starting at the
+        given offset and holding at most limit rows.
+        rtype:list
+        """
+        return list(self.iter_list_rows(media_type, offset, limit))
+
+    def iter_list(self, media_type, offset=0, limit=None, chunk_size=None, header=True):
+        """
+        Lazily yields the lines of the title list of 'Movie', 'TV Show' or 'Book', each ending with a newline:
+        the header first (unless header is False), then the rows from offset, at most limit of them.
+        With chunk_size, the lines are yielded as strings of up to chunk_size joined lines instead,
+        so a consumer can write or display a huge list piece by piece with constant memory.
+        """
+        lines = (row + "\n" for row in self.iter_list_rows(media_type, offset, limit))
+        if header:
+            lines = chain([self.get_list_header(media_type) + "\n"], lines)
+        if chunk_size is None:
+            yield from lines
+            return
+        while True:
+            chunk = "".join(islice(lines, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_movie_list(self, offset=0, limit=None, chunk_size=None):
+        """Lazily yields the lines of the movie list with their titles and runtimes; see iter_list."""
+        return self.iter_list('Movie', offset, limit, chunk_size)
+
+    def iter_tv_list(self, offset=0, limit=None, chunk_size=None):
+        """Lazily yields the lines of the TV show list with their titles and number of seasons; see iter_list."""
+        return self.iter_list('TV Show', offset, limit, chunk_size)
+
+    def iter_book_list(self, offset=0, limit=None, chunk_size=None):
+        """Lazily yields the lines of the book list with their titles and authors; see iter_list."""
+        return self.iter_list('Book', offset, limit, chunk_size)
 
     def get_movie_list(self):
         """
         Generates a formatted string list of all stored movies, including their titles and runtimes.
         The list includes a header and each movie detail is tab-separated.
+        The lines are produced by iter_movie_list and joined once.
         """
-        movie_list = "Title\t\t\t\t\t\t\t\t\t\t\t\tRuntime\n"
-        # Iterate through all shows and filter movies to compile their details
-        for show in self.shows.values():
-            if isinstance(show, Show) and show.get_show_type() == 'Movie':
-                movie_list += f"{show.get_title()}\t\t\t\t\t\t\t\t\t\t\t\t{show.get_duration()}\n"
-        return movie_list
+        return "".join(self.iter_movie_list())
 
     def get_tv_list(self):
         """
         Generates a formatted string list of all stored TV shows, including their titles and number of seasons.
         The list includes a header and each TV show detail is tab-separated.
-            """
-        tv_list = "Title\t\t\t\t\t\t\t\t\t\t\t\tSeasons\n"
-        # Iterate through all shows and filter TV shows to compile their details
-        for show in self.shows.values():
-            if isinstance(show, Show) and show.get_show_type() == 'TV Show':
-                tv_list += f"{show.get_title()}\t\t\t\t\t\t\t\t\t\t\t\t{show.get_duration()}\n"
-        return tv_list
+        The lines are produced by iter_tv_list and joined once.
+        """
+        return "".join(self.iter_tv_list())
 
     def get_book_list(self):
         """
         Generates a formatted string list of all stored books, including their titles and authors.
         The list includes a header and each book detail is tab-separated.
+        The lines are produced by iter_book_list and joined once.
         """
-        book_list = "Title\t\t\t\t\t\t\t\t\t\t\t\tAuthors\n"
-        for book in self.books.values():
-            if isinstance(book, Book):
-                book_list += f"{book.get_title()}\t\t\t\t\t\t\t\t\t\t\t\t{book.get_authors()}\n"
-        return book_list
+        return "".join(self.iter_book_list())
 
     def get_movie_stats(self):
         """
-        Calculates and returns statistics for movies stored in the system, including average duration,
+        Returns statistics for movies stored in the system, including average duration,
         ratings distribution, most common director, most common actor, and most common genre.
+        The statistics are computed from columns of numbers and codes kept up to date as shows are loaded.
         """
-        ratings = {}
-        total_duration = 0
-        directors = Counter()
-        actors = Counter()
-        genres = Counter()
-
-        # Iterate through all shows and collect statistics for movies
-        for show in self.shows.values():
-            if isinstance(show, Show) and show.get_show_type() == 'Movie': # Get the movie duration as an integer
-                duration = int(show.get_duration().replace(' min', '')) # Update rating counts
-                ratings[show.get_rating()] = ratings.get(show.get_rating(), 0) + 1
-                total_duration += duration
-                # Update counters for director, actors, and genres
-                directors.update(show.get_directors().split('\\')) # Split directors and update counter
-                actors.update(show.get_actors().split('\\'))
-                genres.update(show.get_genres().split('\\'))
-
-        count = len([show for show in self.shows.values() if isinstance(show, Show) and show.get_show_type() == 'Movie'])
-        average_duration = total_duration / count if count else 0
-        ratings_percentages = {k: f"{(v / count * 100):.2f}%" for k, v in ratings.items()}
-
-        most_common_director = directors.most_common(1)[0] if directors else ("None", 0)
-        most_common_actor = actors.most_common(1)[0] if actors else ("None", 0)
-        most_common_genre = genres.most_common(1)[0] if genres else ("None", 0)
-
-        return {
-            'Average Duration': f"{average_duration:.2f} minutes",
-            'Ratings Distribution': ratings_percentages,
-            'Most Common Director': most_common_director,
-            'Most Common Actor': most_common_actor,
-            'Most Common Genre': most_common_genre
-        }
+        return self._cached_stats('movie_stats', self._show_stats.movie_summary, len(self.shows))
 
     def get_tv_stats(self):
         """
-        Calculates and returns statistics for TV shows stored in the system, including average number of seasons,
+        Returns statistics for TV shows stored in the system, including average number of seasons,
         ratings distribution, most common actor, and most common genre.
+        The statistics are kept up to date as shows are loaded.
         """
-        ratings = {}
-        total_seasons = 0
-        actors = Counter()
-        genres = Counter()
+        return self._cached_stats('tv_stats', self._show_stats.tv_summary, len(self.shows))
 
-        # Iterate through all shows and collect statistics for TV shows
-        for show in self.shows.values():
-            if isinstance(show, Show) and show.get_show_type() == 'TV Show':
-                seasons = int(show.get_duration().replace(' Seasons', '').replace(' Season', ''))
-                ratings[show.get_rating()] = ratings.get(show.get_rating(), 0) + 1
-                total_seasons += seasons
-                actors.update(show.get_actors().split(', ')) # Split actors and update counter
-                genres.update(show.get_genres().split(', '))
+    def get_book_stats(self):
+        """
+        Returns statistics for books stored in the system, including average page count,
+        most common author, and most common publisher.
+        The statistics are kept up to date as books are loaded.
+        """
+        return self._cached_stats('book_stats', self._book_stats.summary, len(self.books))
 
-        count = len([show for show in self.shows.values() if isinstance(show, Show) and show.get_show_type() == 'TV Show'])
-        average_seasons = total_seasons / count if count else 0
-        ratings_percentages = {k: f"{(v / count * 100):.2f}%" for k, v in ratings.items()} # Calculate ratings percentages
+    def get_rating_distribution(self, media_type):
+        """
+        Returns a dictionary mapping every rating of the 'Movie' or 'TV Show' shows to the number of shows
+        with that rating, in order of first appearance. It only counts ratings, so the rating charts
+        do not need the full statistics.
+        """
+        def compute():
+            count_rows(len(self.shows))
+            return tuple(self._show_stats.rating_counts(media_type))
+        return dict(self._query_cache.get(('rating_distribution', media_type), compute))
 
-        most_common_actor = actors.most_common(1)[0] if actors else ("None", 0)
-        most_common_genre = genres.most_common(1)[0] if genres else ("None", 0)
+    def _cached_stats(self, name, summary, rows):
+        """
+        Returns a copy of the cached statistics dictionary, so callers may change it without affecting the cache.
+        rows is the number of records summarized when the statistics are not cached.
+        """
+        def compute():
+            count_rows(rows)
+            return summary()
+        return copy.deepcopy(self._query_cache.get((name,), compute))
 
-        return {
-            'Average Seasons': f"{average_seasons:.2f}",
-            'Ratings Distribution': ratings_percentages,
-            'Most Common Actor': most_common_actor,
-            'Most Common Genre': most_common_genre
-        }
+    def get_cache_info(self):
+        """Returns the hit, miss and eviction counters and the size of the query cache."""
+        return self._query_cache.info()
 
-    def get_book_stats(self):
+    def clear_cache(self):
+        """Forgets every cached query result."""
+        self._query_cache.clear()
+
+    def enable_metrics(self, registry=None):
         """
-        Calculates and returns statistics for books stored in the system, including average page count,
-        most common author, and most common publisher.
+        Starts recording the calls, latencies, rows scanned and result sizes of the public load, list,
+        statistics, search and recommendation methods in a MetricsRegistry (a new one by default),
+        and returns the registry. Until then the methods run unmeasured, without any overhead.
         """
-        total_pages = 0
-        authors = Counter()
-        publishers = Counter()
+        self.metrics = registry if registry is not None else MetricsRegistry()
+        self._wrap_methods()
+        return self.metrics
 
-        # Iterate through all books and collect statistics
-        for book in self.books.values():
-            pages = int(book.get_num_pages())
-            total_pages += pages
-            authors[book.get_authors()] += 1
-            publishers[book.get_publisher()] += 1
+    def disable_metrics(self):
+        """Stops recording metrics; the registry keeps the metrics recorded so far."""
+        self.metrics = None
+        self._wrap_methods()
 
-        count = len(self.books)
-        average_pages = total_pages / count if count else 0
-        most_common_author = authors.most_common(1)[0] if authors else ("None", 0)
-        most_common_publisher = publishers.most_common(1)[0] if publishers else ("None", 0)
+    def enable_profiling(self, directory, methods=INSTRUMENTED_METHODS, top=None):
+        """
+        Profiles every later call of the given public methods (by default all load, list, statistics,
+        search and recommendation methods) with cProfile and tracemalloc, writing a report of the hotspots
+        and allocation sites of each call to the directory. Returns the Profiler, whose reports attribute
+        lists the reports written; top is the number of entries per report (25 by default).
+        Profiling slows the calls down, so it is meant for investigations only.
+        """
+        unknown = [name for name in methods if name not in INSTRUMENTED_METHODS]
+        if unknown:
+            raise ValueError(f"Cannot profile {', '.join(unknown)}; choose from {', '.join(INSTRUMENTED_METHODS)}.")
+        # cProfile and tracemalloc are only imported when profiling is used
+        from Profiler import Profiler
+        self.profiler = Profiler(directory, methods=methods) if top is None else Profiler(directory, top, methods)
+        self._wrap_methods()
+        return self.profiler
 
-        return {
-            'Average Page Count': f"{average_pages:.2f} pages",
-            'Most Common Author': most_common_author,
-            'Most Common Publisher': most_common_publisher
-        }
+    def disable_profiling(self):
+        """Stops profiling; the reports written so far are kept."""
+        self.profiler = None
+        self._wrap_methods()
+
+    def _wrap_methods(self):
+        """
+        Replaces the measured and profiled methods of this instance with the wrappers needed by the enabled
+        metrics and profiling, or restores the plain methods. The profiler wraps the metrics, so the
+        metrics do not include the time spent profiling.
+        """
+        uninstrument(self, INSTRUMENTED_METHODS)
+        if self.metrics is not None:
+            instrument(self, INSTRUMENTED_METHODS, self.metrics)
+        if self.profiler is not None:
+            for name in self.profiler.methods:
+                setattr(self, name, self.profiler.wrap(name, getattr(self, name)))
+
+    def get_metrics(self):
+        """Returns the metrics of every measured method called so far, or an empty dictionary if metrics are disabled."""
+        return self.metrics.summary() if self.metrics is not None else {}
+
+    def _narrowed_candidates(self, kind, media_type, criteria):
+        """
+        Returns the IDs matched by the previous search of the same kind and media type, in load order,
+        if every one of its criteria is contained in the new one. Every criterion is a case-insensitive
+        substring test, so a record matching the new criteria also matched the previous ones and only
+        those results need to be checked again. Returns None if the whole catalog must be searched.
+        """
+        previous = self._last_searches.get(kind)
+        if previous is None or previous[0] != media_type:
+            return None
+        previous_criteria, ids = previous[1], previous[2]
+        if all(previous_criteria[field] in value.lower() for field, value in criteria.items()):
+            return ids
+        return None
+
+    def _remember_search(self, kind, media_type, criteria, ids):
+        """Remembers the lowercased criteria and the matching IDs of a search for _narrowed_candidates."""
+        lowered = {field: value.lower() for field, value in criteria.items()}
+        self._last_searches[kind] = (media_type, lowered, ids)
 
     def search_tv_movies(self, show_type, title, director, actor, genre):
         """
         Searches for TV shows or movies based on the type, title, director, actor, and genre specified by the user.
         It validates inputs and returns the results formatted in neat columns with corresponding headers.
+        Results are cached; the criteria are compared ignoring case, like the search itself.
         """
+        key = ('search_tv_movies', show_type, title.lower(), director.lower(), actor.lower(), genre.lower())
+        return self._query_cache.get(key, lambda: self._search_tv_movies(show_type, title, director, actor, genre))
+
+    def _search_tv_movies(self, show_type, title, director, actor, genre):
+        """Runs a show search for search_tv_movies without the cache."""
         if show_type not in ['Movie', 'TV Show']:
             return None, "Please select 'Movie' or 'TV Show' from Type first."
 
@@ -248,18 +916,30 @@ class Recommender:
 
         results = []
         max_title_len = max_director_len = max_actor_len = max_genre_len = 0
-        for show in self.shows.values():
+        criteria = {'title': title, 'director': director, 'actor': actor, 'genre': genre}
+        candidate_ids = self._narrowed_candidates('shows', show_type, criteria)
+        if candidate_ids is None:
+            # Only the shows the index could not rule out are checked against the search criteria,
+            # or every show of the type in load order if the criteria are too short for the index
+            candidates = self._show_index.search(criteria)
+            if candidates is None:
+                candidate_ids = self._ordered_ids(show_type)
+        if candidate_ids is not None:
+            candidates = [self.shows[show_id] for show_id in candidate_ids]
+        count_rows(len(candidates))
+        for show in candidates:
             if show.get_show_type() == show_type and \
                (not title or title.lower() in show.get_title().lower()) and \
                (not director or director.lower() in show.get_directors().lower()) and \
-               (not actor or any(actor.lower() in actor_name.lower() for actor_name in show.get_actors().split(', '))) and \
+               (not actor or any(actor.lower() in actor_name.lower() for actor_name in show.get_actor_list())) and \
                (not genre or genre.lower() in show.get_genres().lower()):
                 results.append(show)
                 # Update maximum lengths for dynamic formatting
                 max_title_len = max(max_title_len, len(show.get_title()))
                 max_director_len = max(max_director_len, len(show.get_directors()))
-                max_actor_len = max(max_actor_len, max(len(actor_name) for actor_name in show.get_actors().split(', ')))
+                max_actor_len = max(max_actor_len, max(map(len, show.get_actor_list()), default=0))
                 max_genre_len = max(max_genre_len, len(show.get_genres()))
+        self._remember_search('shows', show_type, criteria, [show.get_id() for show in results])
 
         if not results:
             return "No Results", None
@@ -268,7 +948,7 @@ class Recommender:
         format_str = f"{{:<{max_title_len}}}  {{:<{max_director_len}}}  {{:<{max_actor_len}}}  {{:<{max_genre_len}}}\n"
         header = format_str.format("Title", "Director", "Actors", "Genres")
         formatted_results = [header] + [
-            format_str.format(show.get_title(), show.get_directors(), ', '.join(show.get_actors().split(', ')), show.get_genres())
+            format_str.format(show.get_title(), show.get_directors(), show.get_actors(), show.get_genres())
             for show in results
         ]
         # Join all formatted results and return
@@ -279,14 +959,30 @@ class Recommender:
         """
         Searches for books based on title, author, and publisher. Validates input and returns formatted results.
         If no input criteria are specified, it prompts the user to enter search criteria.
+        Results are cached like those of search_tv_movies.
         """
+        key = ('search_books', title.lower(), author.lower(), publisher.lower())
+        return self._query_cache.get(key, lambda: self._search_books(title, author, publisher))
+
+    def _search_books(self, title, author, publisher):
+        """Runs a book search for search_books without the cache."""
         if not any([title, author, publisher]):
             return None, "Please enter information for Title, Author, and/or Publisher."
 
         results = []
         max_title_len = max_author_len = max_publisher_len = 0 # Initialize maximum lengths for dynamic formatting
-        # Search through the books and filter based on the provided criteria
-        for book_id, book in self.books.items():
+        criteria = {'title': title, 'author': author, 'publisher': publisher}
+        candidates = self._narrowed_candidates('books', 'Book', criteria)
+        if candidates is None:
+            # Search through the books the index could not rule out and filter based on the provided criteria,
+            # or through every book if the criteria are too short for the index
+            candidates = self._book_index.search(criteria)
+            if candidates is None:
+                candidates = self.books.values()
+        else:
+            candidates = [self.books[book_id] for book_id in candidates]
+        count_rows(len(candidates))
+        for book in candidates:
             # Check if the book matches all non-empty search criteria
             if (not title or title.lower() in book.get_title().lower()) and \
                (not author or author.lower() in book.get_authors().lower()) and \
@@ -296,6 +992,7 @@ class Recommender:
                 max_title_len = max(max_title_len, len(book.get_title()))
                 max_author_len = max(max_author_len, len(book.get_authors()))
                 max_publisher_len = max(max_publisher_len, len(book.get_publisher()))
+        self._remember_search('books', 'Book', criteria, [book.get_id() for book in results])
 
         if not results:
             return "No Results", None
@@ -306,65 +1003,159 @@ class Recommender:
 
         return '\n'.join(formatted_results), None
 
-    def get_recommendations(self, media_type, title):
+    def find_titles(self, media_type, title, match='substring'):
+        """
+        Finds the IDs of the Movies, TV Shows or Books whose title matches the given title, ignoring case,
+        in the order they were loaded. The match can be 'exact', 'prefix' or 'substring'.
+        rtype:list
+        """
+        index = self._title_indexes.get(media_type)
+        if index is None:
+            return []
+        positions = self._book_positions if media_type == 'Book' else self._show_positions
+        matches = sorted(index.find(title, match), key=positions.__getitem__)
+        count_rows(len(matches))
+        return matches
+
+    def get_top_associations(self, item_id, k=10, media_type=None):
+        """
+        Returns up to k (ID, count) pairs for the items most often associated with the given ID,
+        ranked by how often they were associated. media_type can limit the result to 'Book',
+        'Movie' or 'TV Show' items that are loaded; without it every associated ID is included.
+        rtype:list
+        """
+        return self.associations.top_k(item_id, k, self._accept(media_type))
+
+    def _accept(self, media_type):
+        """Returns a function accepting the loaded IDs of 'Book', 'Movie' or 'TV Show' items, or None for any ID."""
+        if media_type == 'Book':
+            return self.books.__contains__
+        if media_type is not None:
+            return lambda media_id: media_id in self.shows and self.shows[media_id].get_show_type() == media_type
+        return None
+
+    def build_similarity(self, metric='cosine', k=20, max_workers=None, use_processes=None):
+        """
+        Computes the k most similar items of every associated item, comparing the items they are associated
+        with by 'cosine' or 'jaccard' similarity. The chunks of the computation run in separate processes
+        when the machine has more than one core. The model is kept until associations are loaded again and
+        is saved in snapshots, so save_snapshot after building it avoids computing it again.
+        Returns the ItemSimilarity model.
+        """
+        self.similarity = ItemSimilarity.build(self.associations, metric, k, max_workers, use_processes)
+        self.similarity_stale = False
+        self._query_cache.clear()  # Recommendations can now reach similar items
+        return self.similarity
+
+    def get_similar_items(self, item_id, k=10, media_type=None):
+        """
+        Returns up to k (ID, score) pairs of the items most similar to the given ID, optionally limited
+        to one media type like get_top_associations. Empty until build_similarity has been called.
+        rtype:list
+        """
+        if self.similarity is None:
+            return []
+        return self.similarity.neighbors(item_id, k, self._accept(media_type))
+
+    def get_two_hop_recommendations(self, item_id, k=10, media_type=None):
+        """
+        Returns up to k (ID, score) pairs of items associated with the items most similar to the given ID,
+        leaving out the items it is directly associated with. Each item scores the sum of similarity times
+        association count over the similar items it is associated with. The associations of the item and of
+        each of its k similar items are ranked, so the cost grows with k and with how many items those are
+        associated with, but not with the rest of the graph. Empty without a similarity model.
+        rtype:list
+        """
+        return self._two_hop(item_id, k, self._accept(media_type))
+
+    def _two_hop(self, item_id, k, accept):
+        """Returns the two-hop recommendations of get_two_hop_recommendations for IDs accepted by accept."""
+        if self.similarity is None:
+            return []
+        direct = {other_id for other_id, _ in self.associations.top_k(item_id)}
+        scores = {}
+        for similar_id, similarity in self.similarity.neighbors(item_id):
+            for other_id, count in self.associations.top_k(similar_id, self.similarity.k, accept):
+                if other_id != item_id and other_id not in direct:
+                    scores[other_id] = scores.get(other_id, 0.0) + similarity * count
+        # Ties keep the order in which the items were reached
+        return sorted(scores.items(), key=lambda pair: -pair[1])[:k]
+
+    def get_recommendations(self, media_type, title, match='substring', warn=True):
         """
         Provides recommendations based on a specified media type (Movie, TV Show, or Book) and title.
         For Movies and TV Shows, it returns associated books. For Books, it returns associated Movies or TV Shows.
+        Associated items are listed from the most to the least often associated.
+        The title is matched as a substring by default, or with match='exact' / 'prefix'.
+        If no title matches, a warning dialog is shown unless warn is False.
         Returns: A formatted string of recommendations or a message indicating no results were found.
         rtype:str
         """
+        # Titles are matched ignoring case, so the cache key does too
+        key = ('get_recommendations', media_type, title.lower(), match)
+        results = self._query_cache.get(key, lambda: self._recommendations(media_type, title, match))
+        # The warning is shown on every call, also when the result comes from the cache
+        if results == "No results" and warn:
+            from tkinter import messagebox
+            messagebox.showwarning("Warning", "No recommendations for that title")
+        return results
+
+    def _recommendations(self, media_type, title, match):
+        """Builds the recommendations returned by get_recommendations, without the cache and the warning dialog."""
         recommendations = []
         # Validate media type and search in the shows dictionary if it's Movie or TV Show
         if media_type in ['Movie', 'TV Show']:
             found = False
-            # Loop through all shows to find matches based on title and type
-            for show in self.shows.values():
-                if show.get_show_type() == media_type and title.lower() in show.get_title().lower():
-                    found = True
-                    # generate associated books from the associations dictionary
-                    associated_books = self.associations.get(show.get_id(), [])
-                    if not associated_books:
-                        recommendations.append("No associated books found for this title.")
-                    else:
-                        for book_id in associated_books:
-                            if book_id in self.books:
-                                book = self.books[book_id]
-                                book_details = (f"Title:\n{book.get_title()}\nAuthor:{book.get_authors()}\n"
-                                                f"Avg Rating:\n{book.get_avg_rating()}\nIsbn:\n{book.get_isbn()}\n"
-                                                f"Isbn13:\n{book.get_isbn13()}\nLanguage Coder:\n{book.get_language_code()}\n"
-                                                f"Num Pages:\n{book.get_num_pages()}\nAtings Count:\n{book.get_ratings_count()}\n"
-                                                f"Publication Date:\n{book.get_publication_date()}\nPublisher:\n{book.get_publisher()}\n\n"
-                                                "********************************\n")
-
-
-                                recommendations.append(book_details)
-            # If no shows match the title and type, show a warning and return "No results"
+            # Look up the shows matching the title and type in the title index
+            for show_id in self.find_titles(media_type, title, match):
+                show = self.shows[show_id]
+                found = True
+                # generate associated books from the association graph, most associated first
+                book_ids = [book_id for book_id, _ in self.associations.top_k(show_id, accept=self.books.__contains__)]
+                if not book_ids:
+                    # Without direct associations, recommend the books of the most similar items
+                    book_ids = [book_id for book_id, _ in self._two_hop(show_id, 10, self.books.__contains__)]
+                if not book_ids and show.get_id() not in self.associations:
+                    recommendations.append("No associated books found for this title.")
+                else:
+                    for book_id in book_ids:
+                        book = self.books[book_id]
+                        book_details = (f"Title:\n{book.get_title()}\nAuthor:{book.get_authors()}\n"
+                                        f"Avg Rating:\n{book.get_avg_rating()}\nIsbn:\n{book.get_isbn()}\n"
+                                        f"Isbn13:\n{book.get_isbn13()}\nLanguage Coder:\n{book.get_language_code()}\n"
+                                        f"Num Pages:\n{book.get_num_pages()}\nAtings Count:\n{book.get_ratings_count()}\n"
+                                        f"Publication Date:\n{book.get_publication_date()}\nPublisher:\n{book.get_publisher()}\n\n"
+                                        "********************************\n")
+
+
+                        recommendations.append(book_details)
+            # If no shows match the title and type, return "No results" so a warning is shown
             if not found:
-                messagebox.showwarning("Warning", "No recommendations for that title")
                 return "No results"
 
         elif media_type == 'Book':
             found = False
-            # Loop through all books to find matches based on title
-            for book in self.books.values():
-                if title.lower() in book.get_title().lower():
-                    found = True
-                    associated_media = self.associations.get(book.get_id(), [])
-                    if not associated_media:
-                        recommendations.append("No associated movies or TV shows found for this book.")
-                    else:
-                        for media_id in associated_media:
-                            if media_id in self.shows:
-                                show = self.shows[media_id]
-                                media_details = (f"Title: {show.get_title()}\nShow Type: {show.get_show_type()}\n"
-                                                f"Avg Rating: {show.get_avg_rating()}\nDirectors: {show.get_directors()}\n"
-                                                f"Actors: {show.get_actors()}\nCountry: {show.get_country_code()}\n"
-                                                f"Date Added: {show.get_date_added()}\nRelease Year: {show.get_release_year()}\n"
-                                                f"Rating: {show.get_rating()}\nDuration: {show.get_duration()}\n"
-                                                f"Genres: {show.get_genres()}\nDescription: {show.get_description()}\n\n")
-                                recommendations.append(media_details)
+            # Look up the books matching the title in the title index
+            for book_id in self.find_titles('Book', title, match):
+                book = self.books[book_id]
+                found = True
+                media_ids = [media_id for media_id, _ in self.associations.top_k(book_id, accept=self.shows.__contains__)]
+                if not media_ids:
+                    # Without direct associations, recommend the movies and TV shows of the most similar items
+                    media_ids = [media_id for media_id, _ in self._two_hop(book_id, 10, self.shows.__contains__)]
+                if not media_ids and book.get_id() not in self.associations:
+                    recommendations.append("No associated movies or TV shows found for this book.")
+                else:
+                    for media_id in media_ids:
+                        show = self.shows[media_id]
+                        media_details = (f"Title: {show.get_title()}\nShow Type: {show.get_show_type()}\n"
+                                        f"Avg Rating: {show.get_avg_rating()}\nDirectors: {show.get_directors()}\n"
+                                        f"Actors: {show.get_actors()}\nCountry: {show.get_country_code()}\n"
+                                        f"Date Added: {show.get_date_added()}\nRelease Year: {show.get_release_year()}\n"
+                                        f"Rating: {show.get_rating()}\nDuration: {show.get_duration()}\n"
+                                        f"Genres: {show.get_genres()}\nDescription: {show.get_description()}\n\n")
+                        recommendations.append(media_details)
             if not found:
-                messagebox.showwarning("Warning", "No recommendations for that title")
                 return "No results"
 
         # Check if any recommendations were compiled, and return appropriately formatted string or "No results found."
@@ -373,6 +1164,59 @@ class Recommender:
         else:
             return "\n".join(recommendations)
 
+    def iter_batch_recommendations(self, seeds, match='substring', k=None):
+        """
+        Yields the recommendations of many (media_type, title) seeds as dictionaries, in the order of the seeds,
+        without formatting them as text and without any dialog. Every dictionary holds the media type and
+        title of the seed, whether a title matched ('found'), and for each matched item its ID, title and
+        recommendations: the ID, media type and title of the recommended item, its score and 'via', which
+        is 'direct' for an association count or 'similar' for a two-hop similarity score.
+        Each distinct seed is resolved once through the title indexes, so repeated seeds cost nothing.
+        An unknown media type gives a dictionary with an 'error' message instead.
+        """
+        resolved = {}  # (media_type, lowercased title) -> result of the seed
+        for media_type, title in seeds:
+            key = (media_type, title.lower())
+            result = resolved.get(key)
+            if result is None:
+                result = resolved[key] = self._batch_result(media_type, title, match, k)
+            yield {'media_type': media_type, 'title': title, **result}
+
+    def get_batch_recommendations(self, seeds, match='substring', k=None):
+        """Returns the results of iter_batch_recommendations as a list."""
+        return list(self.iter_batch_recommendations(seeds, match, k))
+
+    def _batch_result(self, media_type, title, match, k):
+        """Resolves a single seed of iter_batch_recommendations."""
+        if media_type in ('Movie', 'TV Show'):
+            seeds, accept = self.shows, self.books.__contains__
+        elif media_type == 'Book':
+            seeds, accept = self.books, self.shows.__contains__
+        else:
+            return {'found': False, 'matches': [], 'error': f"Unknown media type {media_type!r}."}
+        matches = []
+        for item_id in self.find_titles(media_type, title, match):
+            recommended = [(other_id, count, 'direct')
+                           for other_id, count in self.associations.top_k(item_id, k, accept)]
+            if not recommended:
+                recommended = [(other_id, score, 'similar')
+                               for other_id, score in self._two_hop(item_id, 10 if k is None else k, accept)]
+            matches.append({
+                'id': item_id,
+                'title': seeds[item_id].get_title(),
+                'recommendations': [self._describe(other_id, score, via) for other_id, score, via in recommended],
+            })
+        return {'found': bool(matches), 'matches': matches}
+
+    def _describe(self, item_id, score, via):
+        """Returns the dictionary describing a recommended Book or show in batch results."""
+        if item_id in self.books:
+            media_type, title = 'Book', self.books[item_id].get_title()
+        else:
+            show = self.shows[item_id]
+            media_type, title = show.get_show_type(), show.get_title()
+        return {'id': item_id, 'media_type': media_type, 'title': title, 'score': score, 'via': via}
+
 if __name__ == "__main__":
     recommender = Recommender()
     recommender = Recommender()
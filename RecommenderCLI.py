@@ -0,0 +1,118 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Command-line entry point for bulk recommendation jobs, running without Tk or a display.
+# The data files (or a snapshot of them) are loaded once, then the seeds are read from a CSV file
+# with one "media type,title" pair per row, for example "Movie,Inception" or "Book,Dune".
+# The recommendations of every seed are written as one JSON object per line after every small batch
+# of seeds is resolved, so the output can be processed while a long job is still running.
+#
+# Usage: python RecommenderCLI.py seeds.csv --shows shows.csv --books books.csv --associations associations.csv
+#        python RecommenderCLI.py seeds.csv --snapshot recommender.snapshot --output results.jsonl
+
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from Recommender import Recommender
+
+# Seeds resolved together by one get_batch_recommendations call; the results are written after every batch
+BATCH_SIZE = 100
+
+
+def read_seeds(file):
+    """
+    Yields the (media_type, title) pairs of a seed file, skipping empty rows and a
+    "media_type,title" header. Rows without a title are reported on stderr and skipped.
+    """
+    for line_number, row in enumerate(csv.reader(file), start=1):
+        if not row or not any(field.strip() for field in row):
+            continue
+        if line_number == 1 and [field.strip().lower() for field in row[:2]] == ['media_type', 'title']:
+            continue
+        if len(row) < 2:
+            print(f"Line {line_number}: expected a media type and a title, skipped.", file=sys.stderr)
+            continue
+        yield row[0].strip(), row[1]
+
+
+def load(recommender, args):
+    """Loads the data files given on the command line, or restores the snapshot; returns False if nothing was loaded."""
+    files = {kind: getattr(args, kind) for kind in ('books', 'shows', 'associations') if getattr(args, kind)}
+    if files:
+        recommender.load_files(snapshot=args.snapshot, **files)
+        return True
+    if args.snapshot:
+        return recommender.load_snapshot(args.snapshot, check_content=False)
+    return False
+
+
+def write_results(recommender, seeds, output, match, k):
+    """
+    Writes the recommendations of every seed to the output as JSON lines and returns the number of seeds
+    and of found seeds. The seeds are resolved in batches with get_batch_recommendations, so the metrics
+    of that method cover the whole run.
+    """
+    count = found = 0
+    seeds = iter(seeds)
+    while True:
+        batch = list(islice(seeds, BATCH_SIZE))
+        if not batch:
+            return count, found
+        for result in recommender.get_batch_recommendations(batch, match, k):
+            output.write(json.dumps(result) + "\n")
+            count += 1
+            found += result['found']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write recommendations for many titles as JSON lines.")
+    parser.add_argument('seeds', help="CSV file of media type,title rows ('-' reads standard input)")
+    parser.add_argument('--shows', help="show CSV file")
+    parser.add_argument('--books', help="book CSV file")
+    parser.add_argument('--associations', help="association CSV file")
+    parser.add_argument('--snapshot', help="snapshot restored instead of parsing unchanged files, "
+                                           "or the only data source if no files are given")
+    parser.add_argument('--output', default='-', help="file the JSON lines are written to ('-' for standard output)")
+    parser.add_argument('--match', choices=('exact', 'prefix', 'substring'), default='substring',
+                        help="how seed titles are matched against loaded titles")
+    parser.add_argument('-k', type=int, default=None, help="maximum number of recommendations per matched title")
+    parser.add_argument('--metrics', help="JSON file the per-method metrics of the run are written to")
+    parser.add_argument('--profile', help="directory the profiles of the load and of the whole batch are written to")
+    args = parser.parse_args()
+
+    recommender = Recommender()
+    if args.metrics:
+        recommender.enable_metrics()
+    if args.profile:
+        recommender.enable_profiling(args.profile, ('load_files',))
+    start = time.perf_counter()
+    if not load(recommender, args):
+        parser.error("give the data files, or a snapshot that exists")
+    print(f"Loaded data in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+    seeds_file = sys.stdin if args.seeds == '-' else open(args.seeds, newline='', encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        job = (read_seeds(seeds_file), output, args.match, args.k)
+        if args.profile:
+            seeds, found = recommender.profiler.run('batch_recommendations', write_results, recommender, *job)
+        else:
+            seeds, found = write_results(recommender, *job)
+    finally:
+        if seeds_file is not sys.stdin:
+            seeds_file.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Resolved {seeds} seeds ({found} found) in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    if args.metrics:
+        recommender.metrics.dump(args.metrics)
+    if args.profile:
+        print(f"Profiles written to {args.profile}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
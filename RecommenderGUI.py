@@ -11,11 +11,44 @@
 # to show the proportion of the number of movies and TV shows of different ratings.
 
 
+import math
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from Recommender import Recommender
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from VirtualListView import VirtualListView
+from TaskRunner import TaskRunner
+
+# Milliseconds without a keystroke before a live search runs
+LIVE_SEARCH_DELAY = 150
+# Milliseconds between two checks for rows appended to the loaded files while "Watch files" is on
+WATCH_INTERVAL = 2000
+# Angle of the first wedge of the rating charts, and distances of the labels and percentages from the center
+PIE_START_ANGLE = 90
+PIE_LABEL_DISTANCE = 1.1
+PIE_PERCENT_DISTANCE = 0.6
+
+
+def _move_pie_wedges(chart, data):
+    """
+    Updates the wedges, labels and percentages of a pie chart in place to new counts of the same categories,
+    placing them where Axes.pie would: wedges counterclockwise from the start angle, labels outside the circle
+    and percentages inside it.
+    """
+    total = sum(data.values())
+    theta = PIE_START_ANGLE
+    for wedge, label, percent, (name, count) in zip(chart['wedges'], chart['labels'], chart['percents'], data.items()):
+        share = count / total
+        wedge.set_theta1(theta)
+        wedge.set_theta2(theta + 360 * share)
+        middle = math.radians(theta + 180 * share)
+        x, y = math.cos(middle), math.sin(middle)
+        label.set_text(f"{name} - {share * 100:.2f}%")
+        label.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+        label.set_horizontalalignment('left' if x > 0 else 'right')
+        percent.set_text(f"{share * 100:.2f}%")
+        percent.set_position((PIE_PERCENT_DISTANCE * x, PIE_PERCENT_DISTANCE * y))
+        theta += 360 * share
+
 
 class RecommenderGUI:
     """
@@ -30,6 +63,12 @@ class RecommenderGUI:
         self.root = tk.Tk()
         self.root.title("Media Recommender System")
         self.root.geometry("1200x800")
+        # Loads, searches and statistics run on a worker thread so the window keeps responding
+        self.tasks = TaskRunner(self.root)
+        self.live_searches = {}  # Name of the search method -> pending after() call of a live search
+        self.metrics_registry = None  # Metrics of the Recommender, created when they are first turned on
+        self.pie_charts = {}  # Chart title -> figure, canvas, artists and data of a rating chart drawn earlier
+        self.watch_job = None  # Pending after() call of the next check for appended rows
 
         # Create a Notebook widget that will hold different tabs for functionality
         self.notebook = ttk.Notebook(self.root)
@@ -43,6 +82,7 @@ class RecommenderGUI:
         self.setup_book_search_tab()
         self.setup_recommendation_tab()
         self.setup_ratings_tab()
+        self.setup_diagnostics_tab()
 
         # Setup buttons for loading data and quitting the application
         self.setup_buttons()
@@ -65,14 +105,8 @@ class RecommenderGUI:
         titles_frame.pack(fill='both', expand=True)
         stats_frame.pack(fill='both', expand=True)
 
-        # Setup the text widget for displaying movie titles and runtimes
-        self.movie_titles_text = tk.Text(titles_frame, height=10, width=80)
-        self.movie_titles_text.pack(padx=10, pady=5, fill='both', expand=True)
-        self.movie_titles_text.insert('1.0', 'No movie data loaded yet.')
-        # Add a scrollbar for the movie titles text widget
-        movie_titles_scroll = ttk.Scrollbar(titles_frame, orient='vertical', command=self.movie_titles_text.yview)
-        movie_titles_scroll.pack(side='right', fill='y')
-        self.movie_titles_text['yscrollcommand'] = movie_titles_scroll.set
+        # Setup the list for displaying movie titles and runtimes; only the visible rows are fetched
+        self.movie_titles_list = self.create_title_list(titles_frame, 'Movie', 'No movie data loaded yet.')
 
         # Setup the text widget for displaying detailed movie statistics
         self.movie_stats_text = tk.Text(stats_frame, height=10, width=80)
@@ -97,13 +131,8 @@ class RecommenderGUI:
         titles_frame.pack(fill='both', expand=True)
         stats_frame.pack(fill='both', expand=True)
 
-        # Set up a Text widget in the titles frame for displaying TV show titles and seasons
-        self.tv_titles_text = tk.Text(titles_frame, height=10, width=80)
-        self.tv_titles_text.pack(padx=10, pady=5, fill='both', expand=True)
-        self.tv_titles_text.insert('1.0', 'No TV show data loaded yet.') # Default text before data is loaded
-        tv_titles_scroll = ttk.Scrollbar(titles_frame, orient='vertical', command=self.tv_titles_text.yview)
-        tv_titles_scroll.pack(side='right', fill='y')
-        self.tv_titles_text['yscrollcommand'] = tv_titles_scroll.set
+        # Set up a list in the titles frame for displaying TV show titles and seasons
+        self.tv_titles_list = self.create_title_list(titles_frame, 'TV Show', 'No TV show data loaded yet.')
 
         # Set up another Text widget in the stats frame for displaying detailed statistics of TV shows
         self.tv_stats_text = tk.Text(stats_frame, height=10, width=80)
@@ -127,13 +156,8 @@ class RecommenderGUI:
         titles_frame.pack(fill='both', expand=True)
         stats_frame.pack(fill='both', expand=True)
 
-        # Text widget for displaying book titles and authors
-        self.book_titles_text = tk.Text(titles_frame, height=10, width=80)
-        self.book_titles_text.pack(padx=10, pady=5, fill='both', expand=True)
-        self.book_titles_text.insert('1.0', 'No book data loaded yet.')
-        book_titles_scroll = ttk.Scrollbar(titles_frame, orient='vertical', command=self.book_titles_text.yview)
-        book_titles_scroll.pack(side='right', fill='y')
-        self.book_titles_text['yscrollcommand'] = book_titles_scroll.set
+        # List for displaying book titles and authors
+        self.book_titles_list = self.create_title_list(titles_frame, 'Book', 'No book data loaded yet.')
 
         # Text widget for displaying book statistics
         self.book_stats_text = tk.Text(stats_frame, height=10, width=80)
@@ -142,12 +166,28 @@ class RecommenderGUI:
         book_stats_scroll.pack(side='right', fill='y')
         self.book_stats_text['yscrollcommand'] = book_stats_scroll.set
 
-    def display_movie_stats(self):
+    def create_title_list(self, parent, media_type, empty_text):
+        """
+        Creates a list of the titles of 'Movie', 'TV Show' or 'Book' that only fetches
+        the rows currently visible from the recommender, so long lists stay responsive.
+        """
+        title_list = VirtualListView(
+            parent,
+            lambda offset, limit: self.recommender.get_list_rows(media_type, offset, limit),
+            lambda: self.recommender.get_list_count(media_type),
+            self.recommender.get_list_header(media_type),
+            empty_text)
+        title_list.pack(padx=10, pady=5, fill='both', expand=True)
+        return title_list
+
+    def display_movie_stats(self, stats=None):
         """
         Retrieves and displays statistical data for movies in the movie stats text widget.
         includes ratings distribution, average duration, and other relevant statistics.
+        Statistics already computed on the worker thread can be passed in.
         """
-        stats = self.recommender.get_movie_stats()
+        if stats is None:
+            stats = self.recommender.get_movie_stats()
         # Format the statistics into a readable string
         stats_text = (
             "Ratings:\n" + "\n".join(f"{k}: {v}" for k, v in stats['Ratings Distribution'].items()) + "\n"
@@ -160,12 +200,13 @@ class RecommenderGUI:
         self.movie_stats_text.insert('1.0', stats_text)
 
 
-    def display_tv_stats(self):
+    def display_tv_stats(self, stats=None):
         """
         Retrieves and displays statistical data for TV shows in the TV stats text widget.
         includes ratings distribution, average number of seasons, and other relevant statistics.
         """
-        stats = self.recommender.get_tv_stats()
+        if stats is None:
+            stats = self.recommender.get_tv_stats()
         # Format the statistics into a readable string
         stats_text = (
             "Ratings:\n" + "\n".join(f"{k}: {v}" for k, v in stats['Ratings Distribution'].items()) + "\n"
@@ -178,12 +219,13 @@ class RecommenderGUI:
         self.tv_stats_text.insert('1.0', stats_text)
 
 
-    def display_book_stats(self):
+    def display_book_stats(self, stats=None):
         """
         Retrieves and displays statistical data for books in the book stats text widget.
         includes average page count, most common author, and most common publisher.
         """
-        stats = self.recommender.get_book_stats()
+        if stats is None:
+            stats = self.recommender.get_book_stats()
         stats_text = (
             f"Average Page Count: {stats['Average Page Count']}\n"
             f"Most Common Author: {stats['Most Common Author'][0]} ({stats['Most Common Author'][1]} times)\n"
@@ -228,6 +270,13 @@ class RecommenderGUI:
         # Search button for Movies/TV Shows
         self.movie_tv_search_button = ttk.Button(search_frame, text="Search", command=self.perform_movie_tv_search)
         self.movie_tv_search_button.grid(row=len(labels) + 1, column=0, columnspan=2, pady=10)
+        # Live search: the results follow the fields as the user types
+        self.movie_tv_live_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(search_frame, text="Search as you type", variable=self.movie_tv_live_var).grid(
+            row=len(labels) + 2, column=0, columnspan=2)
+        self.bind_live_search(list(self.entries.values()), self.movie_tv_live_var, self.perform_movie_tv_search)
+        self.movie_tv_type_combo.bind('<<ComboboxSelected>>', lambda event: self.schedule_live_search(
+            self.movie_tv_live_var, self.perform_movie_tv_search))
 
         # Text widget for displaying search results
         self.movie_tv_search_results_text = tk.Text(self.movie_tv_search_tab, height=20, width=80)
@@ -264,6 +313,11 @@ class RecommenderGUI:
         # Create a search button that will trigger the search operation
         search_button = ttk.Button(search_frame, text="Search Books", command=self.perform_book_search)
         search_button.grid(row=len(labels), column=0, columnspan=2, pady=10) # Span across both columns
+        # Live search: the results follow the fields as the user types
+        self.book_live_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(search_frame, text="Search as you type", variable=self.book_live_var).grid(
+            row=len(labels) + 1, column=0, columnspan=2)
+        self.bind_live_search(list(self.book_entries.values()), self.book_live_var, self.perform_book_search)
 
         # Text widget for displaying search results
         self.book_search_results_text = tk.Text(self.book_search_tab, height=20, width=80)
@@ -272,6 +326,28 @@ class RecommenderGUI:
         self.book_search_results_scroll.pack(side='right', fill='y')
         self.book_search_results_text['yscrollcommand'] = self.book_search_results_scroll.set
 
+    def bind_live_search(self, entries, live_var, search):
+        """Runs the search shortly after the user stops typing in any of the entries while live search is on."""
+        for entry in entries:
+            entry.bind('<KeyRelease>', lambda event: self.schedule_live_search(live_var, search))
+
+    def schedule_live_search(self, live_var, search):
+        """
+        Debounces keystrokes: the search runs LIVE_SEARCH_DELAY milliseconds after the last key,
+        so typing a word starts one search instead of one per letter.
+        """
+        if not live_var.get():
+            return
+        pending = self.live_searches.pop(search.__name__, None)
+        if pending is not None:
+            self.root.after_cancel(pending)
+
+        def run():
+            del self.live_searches[search.__name__]
+            search(live=True)
+
+        self.live_searches[search.__name__] = self.root.after(LIVE_SEARCH_DELAY, run)
+
     def setup_recommendation_tab(self):
         """
         Sets up the 'Recommendations' tab in the application's notebook. allows
@@ -333,50 +409,234 @@ class RecommenderGUI:
         # Button to load association data
         load_associations_button = tk.Button(button_frame, text="Load Associations", command=self.load_associations)
         load_associations_button.pack(side='left', padx=10, pady=10) # Next to the book load button
+        # Button to load all three files at once
+        load_all_button = tk.Button(button_frame, text="Load All", command=self.load_all)
+        load_all_button.pack(side='left', padx=10, pady=10)
+        # Ingest the rows appended to the loaded files as they grow
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(button_frame, text="Watch files", variable=self.watch_var,
+                        command=self.watch_files).pack(side='left', padx=10, pady=10)
+        # Progress of the running load and a button to cancel it
+        self.load_progress = ttk.Progressbar(button_frame, length=200, mode='determinate', maximum=1.0)
+        self.load_progress.pack(side='left', padx=10, pady=10)
+        self.cancel_button = tk.Button(button_frame, text="Cancel", command=self.cancel_load, state='disabled')
+        self.cancel_button.pack(side='left', padx=10, pady=10)
+        self.status_label = ttk.Label(button_frame, text="")
+        self.status_label.pack(side='left', padx=10, pady=10)
 
         # Button to show credits
         credit_button = tk.Button(button_frame, text="Credits", command=self.creditInfoBox)
         credit_button.pack(side='left', padx=10, pady=10) # Placed next to the association load button
         # Button to quit the application
-        quit_button = tk.Button(button_frame, text="Quit", command=self.root.quit)
+        quit_button = tk.Button(button_frame, text="Quit", command=self.quit)
         quit_button.pack(side='right', padx=10, pady=10) # Positioned to the far right for clarity and accessibility
 
+    def quit(self):
+        """Cancels the running tasks and closes the application."""
+        self.tasks.shutdown()
+        self.root.quit()
+
     def creditInfoBox(self):
         """Displays project credit information in a dialog box."""
         credit_message = "Project completed by:\n- Dingxin Hu\n- Ruiyang Hu\n\nCompleted on: 2024.5.3"
         messagebox.showinfo("Project Credits", credit_message)
 
+    def ask_for_file(self, description):
+        """Prompts with a file dialog until a file of the given description is selected and returns its path."""
+        file_path = filedialog.askopenfilename(title=f"Select {description}")
+        while not file_path:
+            messagebox.showerror("Error", f"Please select {description}.")
+            file_path = filedialog.askopenfilename(title=f"Select {description}")
+        return file_path
+
+    def display_show_lists(self, stats=None):
+        """Displays the movie and TV show lists and their statistics, given as a (movie, TV) pair if already computed."""
+        movie_stats, tv_stats = stats if stats is not None else (None, None)
+        # Show the newly loaded titles; the lists fetch the visible rows themselves
+        self.movie_titles_list.refresh()
+        self.tv_titles_list.refresh()
+        # Display updated stats for movies and TV shows
+        self.display_movie_stats(movie_stats)
+        self.display_tv_stats(tv_stats)
+
+    def display_book_list(self, stats=None):
+        """Displays the book list and the book statistics."""
+        # Show the newly loaded titles; the list fetches the visible rows itself
+        self.book_titles_list.refresh()
+        self.display_book_stats(stats)  # Update statistics display for books
+
+    def title_lists(self):
+        """Returns the movie, TV show and book title lists."""
+        return (self.movie_titles_list, self.tv_titles_list, self.book_titles_list)
+
+    def pause_title_lists(self):
+        """Stops the title lists from reading the recommender while a task on the worker changes its data."""
+        for title_list in self.title_lists():
+            title_list.pause()
+
+    def resume_title_lists(self):
+        """Lets the title lists read the recommender again and shows its current rows, once no load or update runs."""
+        if self.tasks.is_running('load') or self.tasks.is_running('update'):
+            return
+        for title_list in self.title_lists():
+            title_list.resume()
+
+    def start_load(self, description, load, on_done):
+        """
+        Runs load(progress) on the worker thread while the progress bar follows it, then calls
+        on_done(result) on the main thread. Only one load runs at a time; a new one cancels the previous one.
+        """
+        self.load_progress.configure(mode='determinate', value=0.0)
+        self.status_label.configure(text=f"Loading {description}...")
+        self.cancel_button.configure(state='normal')
+        self.pause_title_lists()
+
+        def on_progress(fraction):
+            if fraction is None:
+                # The size of the file is unknown, so only show that the load is still running
+                self.load_progress.configure(mode='indeterminate')
+                self.load_progress.step(0.05)
+            else:
+                self.load_progress.configure(mode='determinate', value=fraction)
+
+        def finish(text):
+            self.load_progress.configure(mode='determinate', value=0.0)
+            self.status_label.configure(text=text)
+            self.cancel_button.configure(state='disabled')
+            self.resume_title_lists()
+
+        def done(result):
+            finish(f"Loaded {description}.")
+            on_done(result)
+
+        def error(exception):
+            finish("")
+            messagebox.showerror("Error", f"Could not load {description}:\n{exception}")
+
+        self.tasks.submit('load', lambda task: load(task.progress), on_done=done, on_error=error,
+                          on_progress=on_progress, on_cancel=lambda: finish(f"Loading {description} cancelled."))
+
+    def cancel_load(self):
+        """Cancels the running load; the data loaded before it stays unchanged."""
+        self.tasks.cancel('load')
+
     def load_shows(self):
         """Loads and displays show data including movies and TV shows, updating the statistics in the GUI."""
-        self.recommender.load_shows()
-        movies_text = self.recommender.get_movie_list()
-        tv_text = self.recommender.get_tv_list()
-
-        # Clear existing content in text widgets and insert new data
-        self.movie_titles_text.delete('1.0', tk.END)
-        self.movie_titles_text.insert('1.0', movies_text)
-        self.tv_titles_text.delete('1.0', tk.END)
-        self.tv_titles_text.insert('1.0', tv_text)
-        # Display updated stats for movies and TV shows
-        self.display_movie_stats()
-        self.display_tv_stats()
+        path = self.ask_for_file("a show file")
+
+        def load(progress):
+            self.recommender.load_shows(path, progress=progress)
+            # The statistics are computed on the worker too, only displaying them is left to the main thread
+            return self.recommender.get_movie_stats(), self.recommender.get_tv_stats()
+
+        self.start_load("the shows", load, self.display_show_lists)
 
     def load_books(self):
         """Loads and displays book data, updating the book titles and statistics in the GUI."""
-        self.recommender.load_books()
-        books_text = self.recommender.get_book_list()
-        # Update text widget with new book titles or default message if none
-        self.book_titles_text.delete('1.0', tk.END)
-        self.book_titles_text.insert('1.0', books_text)
-        self.display_book_stats()  # Update statistics display for books
+        path = self.ask_for_file("a book file")
+
+        def load(progress):
+            self.recommender.load_books(path, progress=progress)
+            return self.recommender.get_book_stats()
+
+        self.start_load("the books", load, self.display_book_list)
 
     def load_associations(self):
-        self.recommender.load_associations()
+        """Loads association data from the selected file."""
+        path = self.ask_for_file("an association file")
+        self.start_load("the associations",
+                        lambda progress: self.recommender.load_associations(path, progress=progress),
+                        lambda result: None)
+
+    def load_all(self):
+        """Asks for the show, book and association files and loads all three at the same time."""
+        shows = self.ask_for_file("a show file")
+        books = self.ask_for_file("a book file")
+        associations = self.ask_for_file("an association file")
+
+        def load(progress):
+            self.recommender.load_files(books=books, shows=shows, associations=associations, progress=progress)
+            return ((self.recommender.get_movie_stats(), self.recommender.get_tv_stats()),
+                    self.recommender.get_book_stats())
+
+        def done(stats):
+            show_stats, book_stats = stats
+            self.display_show_lists(show_stats)
+            self.display_book_list(book_stats)
+
+        self.start_load("all files", load, done)
+
+    def watch_files(self):
+        """Starts or stops checking the loaded files for appended rows."""
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+        if self.watch_var.get():
+            self.watch_job = self.root.after(WATCH_INTERVAL, self.update_files)
+
+    def update_files(self):
+        """
+        Ingests the rows appended to the loaded files on the worker thread, so the update never runs at the
+        same time as a load, search or statistics task, then shows the updated lists and statistics.
+        """
+        self.watch_job = self.root.after(WATCH_INTERVAL, self.update_files)
+        if self.tasks.is_running('update') or self.tasks.is_running('load'):
+            return
+        # Only file sizes are compared, and nothing else changes the loaded files while no load or update runs
+        if not self.recommender.has_appended_data():
+            return
+        self.pause_title_lists()
+
+        def update(task):
+            report = self.recommender.update_files()
+            if not any(key != 'total_seconds' for key in report):
+                return None  # Only a row still being written was appended
+            return report, ((self.recommender.get_movie_stats(), self.recommender.get_tv_stats()),
+                            self.recommender.get_book_stats())
+
+        def done(result):
+            self.resume_title_lists()
+            if result is None:
+                return
+            report, (show_stats, book_stats) = result
+            files = [file_report for file_report in report.values() if isinstance(file_report, dict)]
+            errors = [file_report['error'] for file_report in files if 'error' in file_report]
+            if errors:
+                self.status_label.configure(text=f"Could not update the files: {errors[0]}")
+            else:
+                self.status_label.configure(text=f"Added {sum(file_report['rows'] for file_report in files)} appended rows.")
+            self.display_show_lists(show_stats)
+            self.display_book_list(book_stats)
+
+        def error(exception):
+            self.resume_title_lists()
+            self.status_label.configure(text=f"Could not update the files: {exception}")
+
+        self.tasks.submit('update', update, on_done=done, on_error=error)
+
+    def task_error(self, description):
+        """Returns an on_error callback for a worker task, showing the exception that stopped it in an error dialog."""
+        return lambda exception: messagebox.showerror("Error", f"Could not {description}:\n{exception}")
+
+    def show_search_results(self, text_widget, result, live=False):
+        """
+        Displays the (results, error) pair returned by a search in a results text widget.
+        Live searches only clear the results instead of showing an error dialog on every keystroke.
+        """
+        results, error = result
+        text_widget.delete('1.0', tk.END)  # Clear existing content in the results display area
+        if error and live:
+            return
+        if error:
+            messagebox.showerror("Search Error", error)  # Display any errors encountered during the search
+            text_widget.insert('1.0', "No Results")
+        else:
+            text_widget.insert('1.0', results if results else "No Results")
 
-    def perform_movie_tv_search(self):
+    def perform_movie_tv_search(self, live=False):
         """
         Searches for movies or TV shows using input from GUI components and displays the results in the GUI.
-        Alerts user if an error occurs or no data matches the search criteria.
+        Alerts user if an error occurs or no data matches the search criteria, unless it is a live search.
         """
         # Retrieve values from the GUI's ComboBox and Entry widgets
         show_type = self.movie_tv_type_var.get()
@@ -385,34 +645,27 @@ class RecommenderGUI:
         actor = self.entries['actor'].get()
         genre = self.entries['genre'].get()
 
-        # Perform the search operation using the Recommender class
-        results, error = self.recommender.search_tv_movies(show_type, title, director, actor, genre)
-        # Update the GUI based on search results
-        if error:
-            messagebox.showerror("Search Error", error) # Display any errors encountered during the search
-            self.movie_tv_search_results_text.delete('1.0', tk.END) # Clear existing content in the results display area
-            self.movie_tv_search_results_text.insert('1.0', "No Results")
-        else:
-            self.movie_tv_search_results_text.delete('1.0', tk.END)
-            self.movie_tv_search_results_text.insert('1.0', results if results else "No Results")
+        # Perform the search on the worker; the results of an older search still running are dropped
+        self.tasks.submit(
+            'movie_tv_search',
+            lambda task: self.recommender.search_tv_movies(show_type, title, director, actor, genre),
+            on_done=lambda result: self.show_search_results(self.movie_tv_search_results_text, result, live),
+            on_error=self.task_error("search the movies and TV shows"))
 
-    def perform_book_search(self):
+    def perform_book_search(self, live=False):
         """
         Executes a search for books based on the user input from GUI components and displays the results.
-        Alerts the user if an error occurs or no data matches the search criteria.
+        Alerts the user if an error occurs or no data matches the search criteria, unless it is a live search.
         """
         # Retrieve input values from GUI Entry widgets for book search
         title = self.book_entries['title'].get()
         author = self.book_entries['author'].get()
         publisher = self.book_entries['publisher'].get()
-        results, error = self.recommender.search_books(title, author, publisher)
-        if error:
-            messagebox.showerror("Search Error", error)
-            self.book_search_results_text.delete('1.0', tk.END)
-            self.book_search_results_text.insert('1.0', "No Results")
-        else:
-            self.book_search_results_text.delete('1.0', tk.END)
-            self.book_search_results_text.insert('1.0', results if results else "No Results")
+        self.tasks.submit(
+            'book_search',
+            lambda task: self.recommender.search_books(title, author, publisher),
+            on_done=lambda result: self.show_search_results(self.book_search_results_text, result, live),
+            on_error=self.task_error("search the books"))
 
     def perform_recommendations(self):
         """
@@ -420,11 +673,19 @@ class RecommenderGUI:
         """
         media_type = self.recommendation_type_var.get()
         title = self.recommendation_title_entry.get()
-        # Obtain recommendations using the Recommender class
-        results = self.recommender.get_recommendations(media_type, title)
-        # Clear previous results
-        self.recommendation_results_text.delete('1.0', tk.END)
-        self.recommendation_results_text.insert('1.0', results)
+
+        def show(results):
+            # Dialogs may only be opened on the main thread, so the warning is shown here
+            if results == "No results":
+                messagebox.showwarning("Warning", "No recommendations for that title")
+            # Clear previous results
+            self.recommendation_results_text.delete('1.0', tk.END)
+            self.recommendation_results_text.insert('1.0', results)
+
+        # Obtain recommendations using the Recommender class on the worker
+        self.tasks.submit('recommendations',
+                          lambda task: self.recommender.get_recommendations(media_type, title, warn=False),
+                          on_done=show, on_error=self.task_error("get the recommendations"))
 
 
     def generate_pie_charts(self):
@@ -433,17 +694,18 @@ class RecommenderGUI:
         based on data retrieved from the Recommender object, and
         displays them in the designated frames within the GUI.
             """
-        # Retrieve movie and TV show statistics from the Recommender object
-        movie_stats = self.recommender.get_movie_stats()
-        tv_stats = self.recommender.get_tv_stats()
+        def ratings(task):
+            # Count the ratings of movies and TV shows on the worker, without computing the full statistics
+            return (self.recommender.get_rating_distribution('Movie'),
+                    self.recommender.get_rating_distribution('TV Show'))
 
-        # Process ratings data for movies and TV shows for pie chart display
-        movie_ratings = {k: float(v.rstrip('%')) for k, v in movie_stats['Ratings Distribution'].items()}
-        tv_show_ratings = {k: float(v.rstrip('%')) for k, v in tv_stats['Ratings Distribution'].items()}
+        def draw(result):
+            # Update the pie charts for movie ratings and TV show ratings; Tk widgets are only drawn on the main thread
+            movie_ratings, tv_show_ratings = result
+            self.create_pie_chart(movie_ratings, self.frame_movies, "Movie Ratings")
+            self.create_pie_chart(tv_show_ratings, self.frame_tv_shows, "TV Show Ratings")
 
-        # Create pie charts for movie ratings and TV show ratings
-        self.create_pie_chart(movie_ratings, self.frame_movies, "Movie Ratings")
-        self.create_pie_chart(tv_show_ratings, self.frame_tv_shows, "TV Show Ratings")
+        self.tasks.submit('charts', ratings, on_done=draw, on_error=self.task_error("generate the charts"))
 
 
     def setup_ratings_tab(self):
@@ -470,21 +732,110 @@ class RecommenderGUI:
 
     def create_pie_chart(self, data, frame, title):
         """
-        Creates and displays a pie chart within the provided frame using matplotlib,
-        based on the data passed which includes the ratings for either movies or TV shows.
-        """
-        # Create a pie chart using matplotlib and display it in the provided frame
-        fig, ax = plt.subplots()
-        # Convert percentage data into float and format labels with percentages
-        labels = [f"{k} - {v:.2f}%" for k, v in data.items()]
-
-        # Plot the pie chart with autopct to display the percentage value on chart
-        ax.pie(data.values(), labels=labels, autopct='%1.2f%%', startangle=90)
-        ax.set_title(title)
-        ax.axis('equal')  # Ensure that pie is drawn as a circle.
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        Displays a pie chart of the number of movies or TV shows per rating within the provided frame.
+        The figure and canvas of a frame are created on the first call and reused afterwards: when only the
+        counts change the wedges are moved in place, and when nothing changed the chart is not redrawn.
+        """
+        chart = self.pie_charts.get(title)
+        if chart is not None and chart['data'] == data:
+            return  # Same distribution as the one on screen
+        if chart is None:
+            # matplotlib is slow to import, so it is only loaded when the first chart is drawn.
+            # A plain Figure is not registered with pyplot, so nothing keeps it alive but this chart.
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            figure = Figure()
+            canvas = FigureCanvasTkAgg(figure, master=frame)
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            chart = self.pie_charts[title] = {'figure': figure, 'axes': figure.add_subplot(), 'canvas': canvas,
+                                              'data': None}
+
+        if chart['data'] is not None and list(chart['data']) == list(data):
+            # Same ratings in the same order, so only the sizes of the wedges change
+            _move_pie_wedges(chart, data)
+        else:
+            axes = chart['axes']
+            axes.clear()
+            if data:
+                # Format labels with percentages and show the percentage value on the chart with autopct
+                total = sum(data.values())
+                labels = [f"{k} - {v / total * 100:.2f}%" for k, v in data.items()]
+                chart['wedges'], chart['labels'], chart['percents'] = axes.pie(
+                    list(data.values()), labels=labels, autopct='%1.2f%%', startangle=PIE_START_ANGLE)
+            else:
+                axes.text(0.5, 0.5, "No data loaded", ha='center', va='center', transform=axes.transAxes)
+                axes.set_axis_off()
+            axes.set_title(title)
+            axes.axis('equal')  # Ensure that pie is drawn as a circle.
+        chart['data'] = dict(data)
+        chart['canvas'].draw_idle()
+
+    def setup_diagnostics_tab(self):
+        """
+        Sets up the 'Diagnostics' tab, which turns the per-method metrics of the Recommender on and off
+        and shows the calls, latency percentiles, rows scanned and result sizes of every measured method.
+        """
+        diagnostics_tab = ttk.Frame(self.notebook)
+        self.notebook.add(diagnostics_tab, text='Diagnostics')
+
+        button_frame = ttk.Frame(diagnostics_tab)
+        button_frame.pack(side='top', fill='x', padx=10, pady=10)
+        # Metrics cost a little time per call, so they are only collected on request
+        self.metrics_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(button_frame, text="Collect metrics", variable=self.metrics_var,
+                        command=self.toggle_metrics).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Refresh", command=self.display_metrics).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Reset", command=self.reset_metrics).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Save JSON...", command=self.save_metrics).pack(side='left', padx=5)
+
+        self.metrics_text = tk.Text(diagnostics_tab, height=20, width=120, font=('Courier', 10), wrap='none')
+        self.metrics_text.pack(padx=10, pady=10, fill='both', expand=True)
+        self.display_metrics()
+
+    def toggle_metrics(self):
+        """Starts or stops collecting metrics, keeping the registry so the numbers collected so far stay visible."""
+        if self.metrics_var.get():
+            self.recommender.enable_metrics(self.metrics_registry)
+            self.metrics_registry = self.recommender.metrics
+        else:
+            self.recommender.disable_metrics()
+        self.display_metrics()
+
+    def display_metrics(self):
+        """Shows the metrics of every measured method and the query cache counters as a table."""
+        metrics = self.metrics_registry.summary() if self.metrics_registry is not None else {}
+        columns = ('calls', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'rows_scanned', 'result_size')
+        lines = [f"{'Method':<28}" + "".join(f"{column:>14}" for column in columns)]
+        for method, summary in metrics.items():
+            cells = (f"{summary[column]:>14.2f}" if column.endswith('_ms') else f"{summary[column]:>14}"
+                     for column in columns)
+            lines.append(f"{method:<28}" + "".join(cells))
+        if not metrics:
+            lines.append("No calls measured yet." if self.metrics_var.get() else "Metrics are off.")
+        cache = self.recommender.get_cache_info()
+        lines.append("")
+        lines.append(f"Query cache: {cache['size']}/{cache['maxsize']} results, {cache['hits']} hits, "
+                     f"{cache['misses']} misses ({cache['hit_rate']:.0%} hit rate), {cache['evictions']} evictions")
+        self.metrics_text.configure(state='normal')
+        self.metrics_text.delete(1.0, tk.END)
+        self.metrics_text.insert(tk.END, "\n".join(lines))
+        self.metrics_text.configure(state='disabled')
+
+    def reset_metrics(self):
+        """Forgets the metrics collected so far."""
+        if self.metrics_registry is not None:
+            self.metrics_registry.reset()
+        self.display_metrics()
+
+    def save_metrics(self):
+        """Writes the collected metrics to a JSON file chosen in a dialog."""
+        if self.metrics_registry is None:
+            messagebox.showinfo("Metrics", "Turn on 'Collect metrics' first.")
+            return
+        path = filedialog.asksaveasfilename(title="Save metrics", defaultextension='.json',
+                                            filetypes=[("JSON files", "*.json")])
+        if path:
+            self.metrics_registry.dump(path)
 
 # Main function to run the GUI
 if __name__ == "__main__":
@@ -0,0 +1,317 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Serves a loaded Recommender to local clients as a small HTTP/JSON service, without Tk or a display.
+# The data files (or a snapshot of them) are loaded once, then an asyncio server answers searches, statistics,
+# title lists and recommendations for many clients at once. The loaded data is shared read-only by all clients:
+# everything the Recommender otherwise builds on first use is built before the server starts, and every query
+# runs on a thread pool so a slow query never blocks the event loop or the other connections.
+# Only a minimal subset of HTTP/1.1 is implemented (GET and POST, Content-Length bodies, keep-alive), which is
+# all that local clients such as curl, urllib or a browser need.
+#
+# Usage: python RecommenderService.py --shows shows.csv --books books.csv --associations associations.csv
+#        python RecommenderService.py --snapshot recommender.snapshot --port 8551
+#        python RecommenderService.py --snapshot recommender.snapshot --unix-socket /tmp/recommender.sock
+#
+# Endpoints (every response is a JSON object):
+#   GET  /health                                        number of loaded records
+#   GET  /search/shows?type=Movie&title=&director=&actor=&genre=
+#   GET  /search/books?title=&author=&publisher=
+#   GET  /stats/movies, /stats/tv, /stats/books
+#   GET  /lists/Movie?offset=0&limit=100                also /lists/TV%20Show and /lists/Book
+#   GET  /recommendations?type=Movie&title=Inception&match=substring&k=10
+#   POST /recommendations  {"seeds": [["Movie", "Inception"], ["Book", "Dune"]], "match": "exact", "k": 5}
+#   GET  /cache                                         query cache counters
+#   GET  /metrics                                       per-method metrics (empty unless started with --metrics)
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from Recommender import Recommender
+from RecommenderCLI import load
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8551
+# Largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+# Seconds an idle keep-alive connection is kept open
+IDLE_TIMEOUT = 30
+MATCH_MODES = ('exact', 'prefix', 'substring')
+LIST_TYPES = ('Movie', 'TV Show', 'Book')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """An error caused by the request, answered with the given HTTP status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _integer(query, name, default):
+    """Returns a non-negative integer query parameter, or the default if it is missing."""
+    value = query.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise RequestError(400, f"Parameter {name!r} must be an integer.")
+    if number < 0:
+        raise RequestError(400, f"Parameter {name!r} must not be negative.")
+    return number
+
+
+def _match(value):
+    """Checks a title match mode."""
+    if value not in MATCH_MODES:
+        raise RequestError(400, f"Parameter 'match' must be one of {', '.join(MATCH_MODES)}.")
+    return value
+
+
+class RecommenderService:
+    def __init__(self, recommender, max_workers=None):
+        """
+        Serves the given loaded Recommender; max_workers bounds the number of queries run at the same time.
+        The Recommender must not be loaded again while the service is running.
+        """
+        self.recommender = recommender
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
+        self.requests = 0
+        # (method, path) -> handler taking the query parameters and the decoded JSON body
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/search/shows'): self.search_shows,
+            ('GET', '/search/books'): self.search_books,
+            ('GET', '/stats/movies'): lambda query, body: self.recommender.get_movie_stats(),
+            ('GET', '/stats/tv'): lambda query, body: self.recommender.get_tv_stats(),
+            ('GET', '/stats/books'): lambda query, body: self.recommender.get_book_stats(),
+            ('GET', '/recommendations'): self.recommendations,
+            ('POST', '/recommendations'): self.batch_recommendations,
+            ('GET', '/cache'): lambda query, body: self.recommender.get_cache_info(),
+            ('GET', '/metrics'): lambda query, body: self.recommender.get_metrics(),
+        }
+        # Handlers cheap enough to run on the event loop itself
+        self.inline_routes = {('GET', '/health'), ('GET', '/cache'), ('GET', '/metrics')}
+        # Build the lazily built structures now, so the query threads only read the shared data
+        recommender.prepare()
+
+    # Handlers, run on the thread pool unless listed in inline_routes
+    def health(self, query, body):
+        return {
+            'status': 'ok',
+            'shows': len(self.recommender.shows),
+            'books': len(self.recommender.books),
+            'associated_ids': len(self.recommender.associations),
+            'requests': self.requests,
+        }
+
+    def search_shows(self, query, body):
+        results, error = self.recommender.search_tv_movies(query.get('type', ''), query.get('title', ''),
+                                                           query.get('director', ''), query.get('actor', ''),
+                                                           query.get('genre', ''))
+        if error:
+            raise RequestError(400, error)
+        return {'results': results}
+
+    def search_books(self, query, body):
+        results, error = self.recommender.search_books(query.get('title', ''), query.get('author', ''),
+                                                       query.get('publisher', ''))
+        if error:
+            raise RequestError(400, error)
+        return {'results': results}
+
+    def title_list(self, media_type, query):
+        if media_type not in LIST_TYPES:
+            raise RequestError(404, f"Unknown list {media_type!r}; use one of {', '.join(LIST_TYPES)}.")
+        offset = _integer(query, 'offset', 0)
+        limit = _integer(query, 'limit', 100)
+        return {
+            'media_type': media_type,
+            'header': self.recommender.get_list_header(media_type),
+            'count': self.recommender.get_list_count(media_type),
+            'offset': offset,
+            'rows': self.recommender.get_list_rows(media_type, offset, limit),
+        }
+
+    def recommendations(self, query, body):
+        title = query.get('title', '')
+        if not title:
+            raise RequestError(400, "Parameter 'title' is required.")
+        seed = (query.get('type', ''), title)
+        k = _integer(query, 'k', None)
+        result = self.recommender.get_batch_recommendations([seed], _match(query.get('match', 'substring')), k)[0]
+        if 'error' in result:
+            raise RequestError(400, result['error'])
+        return result
+
+    def batch_recommendations(self, query, body):
+        if not isinstance(body, dict) or not isinstance(body.get('seeds'), list):
+            raise RequestError(400, "The body must be a JSON object with a list of [media type, title] 'seeds'.")
+        seeds = []
+        for seed in body['seeds']:
+            if not (isinstance(seed, list) and len(seed) == 2 and all(isinstance(part, str) for part in seed)):
+                raise RequestError(400, "Every seed must be a [media type, title] pair of strings.")
+            seeds.append(tuple(seed))
+        k = body.get('k')
+        if k is not None and (not isinstance(k, int) or k < 0):
+            raise RequestError(400, "'k' must be a non-negative integer.")
+        match = _match(body.get('match', 'substring'))
+        return {'results': self.recommender.get_batch_recommendations(seeds, match, k)}
+
+    # HTTP handling
+    def _route(self, method, path):
+        """Returns the handler of a request, raising RequestError for unknown paths and methods."""
+        if path.startswith('/lists/'):
+            if method != 'GET':
+                raise RequestError(405, "Only GET is allowed here.")
+            media_type = unquote(path[len('/lists/'):])
+            return (lambda query, body: self.title_list(media_type, query)), False
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise RequestError(405, f"{method} is not allowed on {path}.")
+            raise RequestError(404, f"Unknown path {path}.")
+        return handler, (method, path) not in self.inline_routes
+
+    async def answer(self, method, target, body):
+        """Returns the status and JSON object answering one request."""
+        self.requests += 1
+        try:
+            parts = urlsplit(target)
+            # Repeated parameters keep their last value
+            query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+            handler, threaded = self._route(method, parts.path)
+            if body:
+                try:
+                    body = json.loads(body)
+                except ValueError:
+                    raise RequestError(400, "The body is not valid JSON.")
+            if threaded:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.executor, handler, query, body)
+            else:
+                result = handler(query, body)
+            return 200, result
+        except RequestError as error:
+            return error.status, {'error': str(error)}
+        except Exception as error:
+            print(f"Error answering {method} {target}: {error!r}", file=sys.stderr)
+            return 500, {'error': "Internal error."}
+
+    async def handle_connection(self, reader, writer):
+        """Answers the requests of one connection until the client closes it or asks to close it."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break  # Connection closed by the client
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Malformed request line."}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY:
+                    status = 400 if length < 0 else 413
+                    await self._respond(writer, status, {'error': "Invalid or too large request body."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, result = await self.answer(method.upper(), target, body)
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass  # The client went away or sent something unreadable; nothing left to answer
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, writer, status, result, keep_alive):
+        """Writes one JSON response."""
+        payload = json.dumps(result).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+        """Starts listening on a TCP port, or on a Unix socket if a path is given; returns the asyncio server."""
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+        """Answers requests until the task is cancelled."""
+        server = await self.start(host, port, unix_socket)
+        async with server:
+            await server.serve_forever()
+
+    def shutdown(self):
+        """Waits for the running queries and stops the thread pool."""
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recommendations, searches and statistics as local HTTP/JSON.")
+    parser.add_argument('--shows', help="show CSV file")
+    parser.add_argument('--books', help="book CSV file")
+    parser.add_argument('--associations', help="association CSV file")
+    parser.add_argument('--snapshot', help="snapshot restored instead of parsing unchanged files, "
+                                           "or the only data source if no files are given")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port to listen on (default: %(default)s)")
+    parser.add_argument('--unix-socket', help="listen on this Unix socket path instead of a TCP port")
+    parser.add_argument('--workers', type=int, default=None, help="maximum number of queries answered at once")
+    parser.add_argument('--metrics', action='store_true', help="measure every query, served at /metrics")
+    args = parser.parse_args()
+
+    recommender = Recommender()
+    if args.metrics:
+        recommender.enable_metrics()
+    start = time.perf_counter()
+    if not load(recommender, args):
+        parser.error("give the data files, or a snapshot that exists")
+    service = RecommenderService(recommender, args.workers)
+    print(f"Loaded data in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    where = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"Serving on {where} (Ctrl+C stops)", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The SearchIndex class is an inverted index over the text fields of a group of records.
+# Every field value is lowercased and cut into overlapping three-character pieces (trigrams),
+# and each trigram maps to the rows of the records whose field contains it.
+# A substring query can then only match records that contain every trigram of the query,
+# so intersecting those rows gives a small list of candidates that still has to be checked
+# with the exact substring test, instead of scanning and lowercasing every record.
+# Records are numbered by dense rows in the order they were added, and a field is only indexed on its
+# first query, all rows at once with NumPy: the rows of every trigram are kept as one sorted array of
+# 32-bit integers, so loading stays as fast as without an index and the index stays compact.
+# Rows added or replaced after a field was indexed are checked without the index until there are enough
+# of them to index the field again.
+# The TitleIndex class keeps the lowercased titles in sorted order for exact and prefix lookups
+# with binary search, and uses the trigram index for substring lookups.
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+GRAM_SIZE = 3
+# Share of the rows that may be added or replaced after a field was indexed before it is indexed again
+REINDEX_SHARE = 0.1
+# Rows whose trigrams are collected together while a field is indexed, bounding the temporary arrays
+BUILD_ROWS = 50_000
+
+
+def _gram_codes(text):
+    """
+    Returns the code of every three-character piece of the text, in order: the three code points
+    packed into one 64-bit integer (code points take at most 21 bits).
+    """
+    points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    return (points[:-2] << np.uint64(42)) | (points[1:-1] << np.uint64(21)) | points[2:]
+
+
+def _field_grams(texts, first_row):
+    """
+    Returns the distinct (trigram code, row) pairs of lowercased texts numbered from first_row,
+    sorted by code and then by row.
+    """
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    rows = np.repeat(np.arange(first_row, first_row + len(texts), dtype=np.uint32), lengths)
+    codes = _gram_codes(''.join(texts))
+    if not len(codes):
+        return np.zeros(0, np.uint64), np.zeros(0, np.uint32)
+    # A trigram spanning the end of one text and the start of the next belongs to neither
+    keep = rows[:-2] == rows[2:]
+    codes, rows = codes[keep], rows[:-2][keep]
+    order = np.lexsort((rows, codes))
+    codes, rows = codes[order], rows[order]
+    # A trigram repeated within one text is kept once
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    return codes[first], rows[first]
+
+
+class SearchIndex:
+    def __init__(self, fields):
+        """Creates an empty index of the given fields, a dictionary mapping each field to a function returning its text."""
+        self._fields = fields
+        self._records = []  # Record of every row
+        self._replaced = array('I')  # Rows replaced by add_record, in order
+        # For every indexed field: the sorted trigram codes, the start of the rows of every code in rows,
+        # the rows holding each code, the number of rows indexed and the length of _replaced at that time
+        self._built = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, record):
+        """Adds a record and returns its row."""
+        self._records.append(record)
+        return len(self._records) - 1
+
+    def replace(self, row, record):
+        """Replaces the record of a row, such as a record loaded again with changed fields."""
+        self._records[row] = record
+        self._replaced.append(row)
+
+    def _index(self, field):
+        """Returns the index of a field, building it first if it was never built or too many rows changed since."""
+        built = self._built.get(field)
+        if built is not None:
+            pending = len(self._records) - built[3] + len(self._replaced) - built[4]
+            if pending > REINDEX_SHARE * len(self._records):
+                built = None
+        if built is None:
+            getter = self._fields[field]
+            parts = [_field_grams([getter(record).lower() for record in self._records[start:start + BUILD_ROWS]], start)
+                     for start in range(0, len(self._records), BUILD_ROWS)]
+            codes = np.concatenate([part[0] for part in parts]) if parts else np.zeros(0, np.uint64)
+            rows = np.concatenate([part[1] for part in parts]) if parts else np.zeros(0, np.uint32)
+            # The parts are in row order, so a stable sort keeps the rows of every code ascending
+            order = np.argsort(codes, kind='stable')
+            codes, rows = codes[order], rows[order]
+            grams, starts = np.unique(codes, return_index=True)
+            built = self._built[field] = (grams, np.append(starts, len(codes)), rows, len(self._records),
+                                          len(self._replaced))
+        return built
+
+    def prepare(self):
+        """Indexes every field now rather than on its first query, so queries from several threads only read."""
+        for field in self._fields:
+            self._index(field)
+
+    def _candidate_rows(self, field, query):
+        """Returns the sorted array of rows whose field may contain the query, or None if the query is too short."""
+        query = query.lower()
+        if len(query) < GRAM_SIZE:
+            return None
+        grams, starts, rows, indexed, replaced = self._index(field)
+        codes = np.unique(_gram_codes(query))
+        at = np.minimum(np.searchsorted(grams, codes), max(len(grams) - 1, 0))
+        if not len(grams) or np.any(grams[at] != codes):
+            result = np.zeros(0, np.uint32)  # No indexed row holds one of the trigrams
+        else:
+            # Intersect the shortest row arrays first so the result shrinks as early as possible
+            postings = sorted((rows[starts[position]:starts[position + 1]] for position in at), key=len)
+            result = postings[0]
+            for other in postings[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, other, assume_unique=True)
+        # Rows added or replaced since the field was indexed may match too
+        pending = np.frombuffer(self._replaced, dtype=np.uint32)[replaced:]
+        if len(pending) or indexed < len(self._records):
+            added = np.arange(indexed, len(self._records), dtype=np.uint32)
+            result = np.union1d(result, np.concatenate((pending, added)))
+        return result
+
+    def _rows_to_records(self, rows):
+        return [self._records[row] for row in rows.tolist()]
+
+    def candidates(self, field, query):
+        """
+        Returns the records whose field may contain the query as a substring, in the order they were added,
+        or None when the query is too short to be narrowed down by the index.
+        """
+        rows = self._candidate_rows(field, query)
+        return None if rows is None else self._rows_to_records(rows)
+
+    def search(self, criteria):
+        """
+        Returns the candidate records for a dictionary mapping fields to query strings, in the order they
+        were added, intersecting the candidates of every non-empty query, or None when no query could be
+        narrowed down by the index. The candidates still have to be checked exactly.
+        """
+        result = None
+        for field, query in criteria.items():
+            if not query:
+                continue
+            rows = self._candidate_rows(field, query)
+            if rows is None:
+                continue
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+            if not len(result):
+                break
+        return None if result is None else self._rows_to_records(result)
+
+
+class TitleIndex:
+    def __init__(self, search_index):
+        # The trigram index holding the same records, used to narrow down substring lookups
+        self._search_index = search_index
+        # Lowercased title of every indexed record, keyed by ID
+        self._titles = {}
+        # Lowercased titles in sorted order with the matching IDs, rebuilt on the first lookup after a change
+        self._sorted_titles = []
+        self._sorted_ids = []
+        self._changed = False
+
+    def __len__(self):
+        return len(self._titles)
+
+    def add(self, record_id, title):
+        """Indexes the title of a record, replacing its previous title if it was already indexed."""
+        self._titles[record_id] = title.lower()
+        self._changed = True
+
+    def remove(self, record_id):
+        """Removes a record from the index."""
+        if self._titles.pop(record_id, None) is not None:
+            self._changed = True
+
+    def _sort(self):
+        """Rebuilds the sorted title array if records were added or removed since the last lookup."""
+        if self._changed:
+            pairs = sorted(zip(self._titles.values(), self._titles.keys()))
+            self._sorted_titles = [title for title, _ in pairs]
+            self._sorted_ids = [record_id for _, record_id in pairs]
+            self._changed = False
+
+    def prepare(self):
+        """Sorts the titles now rather than on the next lookup, so lookups from several threads only read."""
+        self._sort()
+
+    def exact(self, title):
+        """Returns the set of IDs whose title equals the given title, ignoring case."""
+        self._sort()
+        title = title.lower()
+        start = bisect_left(self._sorted_titles, title)
+        end = bisect_right(self._sorted_titles, title, start)
+        return set(self._sorted_ids[start:end])
+
+    def prefix(self, title):
+        """Returns the set of IDs whose title starts with the given text, ignoring case."""
+        self._sort()
+        title = title.lower()
+        start = bisect_left(self._sorted_titles, title)
+        end = start
+        # Titles sharing the prefix are next to each other in sorted order
+        while end < len(self._sorted_titles) and self._sorted_titles[end].startswith(title):
+            end += 1
+        return set(self._sorted_ids[start:end])
+
+    def substring(self, title):
+        """Returns the set of IDs whose title contains the given text, ignoring case."""
+        title = title.lower()
+        candidates = self._search_index.candidates('title', title)
+        if candidates is None:
+            # Too short for a trigram; compare against the stored lowercased titles instead
+            return {record_id for record_id, indexed in self._titles.items() if title in indexed}
+        # The trigram index may hold more records than this one, such as the shows of every type
+        ids = (record.get_id() for record in candidates)
+        return {record_id for record_id in ids if title in self._titles.get(record_id, '')}
+
+    def find(self, title, match='substring'):
+        """Returns the set of IDs matching the title using an 'exact', 'prefix' or 'substring' match."""
+        if match == 'exact':
+            return self.exact(title)
+        if match == 'prefix':
+            return self.prefix(title)
+        if match == 'substring':
+            return self.substring(title)
+        raise ValueError(f"Unknown title match: {match}")
@@ -5,10 +5,18 @@
 # It stores information like show type, directors, actors, country code, addition and release dates,
 # rating, duration, genres, and a description.
 
-from Media import Media  # Import the Media base class
+from Media import Media, split_names, share_names  # Import the Media base class
+
+# Directors, actors and genres are separated by commas
+NAME_SEPARATOR = ','
 
 class Show(Media):  # Subclass of Media
-    def __init__(self, show_id, type, title, director, cast, avg_rating, country, date_added, release_year, rating, duration, listed_in, description):
+    # Attributes are kept in slots rather than a per-instance dictionary to save memory
+    __slots__ = ('_show_type', '_directors', '_actors', '_country_code', '_date_added', '_release_year',
+                 '_rating', '_duration', '_genres', '_description', '_director_names', '_actor_names', '_genre_names')
+
+    def __init__(self, show_id, type, title, director, cast, avg_rating, country, date_added, release_year, rating, duration, listed_in, description,
+                 names=None):
         # Initialize Media's attributes
         super().__init__(show_id, title, avg_rating)
 
@@ -23,6 +31,19 @@ class Show(Media):  # Subclass of Media
         self._duration = duration
         self._genres = listed_in
         self._description = description
+        # Directors, actors and genres are also split into tuples of names once, when the show is created;
+        # names holds the three tuples when they were split before, as when a pickled show is restored
+        if names is None:
+            names = (split_names(director, NAME_SEPARATOR), split_names(cast, NAME_SEPARATOR),
+                     split_names(listed_in, NAME_SEPARATOR))
+        self._director_names, self._actor_names, genre_names = names
+        self._genre_names = share_names(genre_names)  # Few distinct genre combinations
+
+    # Pickle as a constructor call, which is much faster than the default handling of slotted objects
+    def __reduce__(self):
+        return (Show, (self._id, self._show_type, self._title, self._directors, self._actors, self._avg_rating,
+                       self._country_code, self._date_added, self._release_year, self._rating, self._duration,
+                       self._genres, self._description, (self._director_names, self._actor_names, self._genre_names)))
 
     # Accessor (getter) methods for each attribute
     def get_show_type(self):
@@ -31,12 +52,18 @@ class Show(Media):  # Subclass of Media
     def get_directors(self):
         return self._directors
 
+    def get_director_list(self):
+        return list(self._director_names)
+
     def get_avg_rating(self):
         return self._avg_rating
 
     def get_actors(self):
         return self._actors
 
+    def get_actor_list(self):
+        return list(self._actor_names)
+
     def get_country_code(self):
         return self._country_code
 
@@ -55,5 +82,8 @@ class Show(Media):  # Subclass of Media
     def get_genres(self):
         return self._genres
 
+    def get_genre_list(self):
+        return list(self._genre_names)
+
     def get_description(self):
         return self._description
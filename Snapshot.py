@@ -0,0 +1,107 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: Functions for saving the fully loaded state of the recommender to a binary snapshot file
+# and loading it back on a later start. The snapshot starts with a small header describing the
+# source files it was built from (path, size, modification time and content hash), followed by
+# the pickled state. The file is memory-mapped when it is read, and the state is only unpickled
+# when every source file is still unchanged, so a stale snapshot is never used.
+
+import gc
+import hashlib
+import mmap
+import os
+import pickle
+
+SNAPSHOT_VERSION = 2
+
+
+def file_signature(path, check_content=True):
+    """
+    Describes a source file by its absolute path, size, modification time and,
+    with check_content, the SHA-1 hash of its content.
+    """
+    info = os.stat(path)
+    signature = {'path': os.path.abspath(path), 'size': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    if check_content:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        signature['sha1'] = digest.hexdigest()
+    return signature
+
+
+def is_current(signatures, check_content=True):
+    """Returns True if every source file still has the size, modification time and content hash it was saved with."""
+    for signature in signatures:
+        try:
+            info = os.stat(signature['path'])
+        except OSError:
+            return False
+        if info.st_size != signature['size'] or info.st_mtime_ns != signature['mtime_ns']:
+            return False
+        if check_content and file_signature(signature['path'])['sha1'] != signature.get('sha1'):
+            return False
+    return True
+
+
+def sign_sources(sources):
+    """
+    Returns the (kind, signature) pairs of source files given as (kind, path) pairs. Taken before the files
+    are parsed, the signatures describe at most the data that was parsed: a file appended to meanwhile
+    no longer matches its signature, so the snapshot is rebuilt instead of missing the appended rows.
+    """
+    return [(kind, file_signature(path)) for kind, path in sources]
+
+
+def save_snapshot(snapshot_path, state, signed_sources):
+    """
+    Writes the state to a snapshot file together with the signatures of the source files, given as
+    (kind, signature) pairs from sign_sources in the order they were loaded. The file is written under
+    a temporary name and renamed afterwards so a reader never sees a half-written snapshot.
+    """
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'sources': signed_sources,
+    }
+    temp_path = f"{snapshot_path}.tmp"
+    with open(temp_path, 'wb') as file:
+        pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, snapshot_path)
+
+
+def load_snapshot(snapshot_path, sources=None, check_content=True):
+    """
+    Reads the state from a snapshot file. Returns None if the file is missing or unreadable, was written
+    by another snapshot version, was built from other sources than the given (kind, path) pairs,
+    or any of its source files has changed since it was written.
+    """
+    try:
+        file = open(snapshot_path, 'rb')
+    except OSError:
+        return None
+    with file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                header = pickle.Unpickler(mapped).load()
+                if header.get('version') != SNAPSHOT_VERSION:
+                    return None
+                saved_sources = [(kind, signature['path']) for kind, signature in header['sources']]
+                if sources is not None and saved_sources != [(kind, os.path.abspath(path)) for kind, path in sources]:
+                    return None
+                if not is_current([signature for _, signature in header['sources']], check_content):
+                    return None
+                # The state follows the header; a fresh unpickler is used so the two memos stay separate.
+                # The garbage collector is paused meanwhile, as it would otherwise rescan the millions
+                # of new objects over and over while they are created. It is left off if the caller had disabled it.
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    return pickle.Unpickler(mapped).load()
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except Exception:
+            # A truncated or incompatible snapshot is treated like a missing one and rebuilt from the sources
+            return None
@@ -0,0 +1,128 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The TaskRunner class runs slow operations of the GUI, such as loading files, searching
+# and computing statistics, on a worker thread so the window keeps responding.
+# Tk widgets may only be used from the main thread, so the worker puts results, errors and progress
+# reports on a queue that the main thread empties regularly through root.after, calling the callbacks
+# given for the task. Every task has a key; starting a new task with the same key cancels the previous one
+# and its results are dropped, so an old search can never overwrite the results of a newer one.
+# A single worker runs the tasks one after another, so the recommender is never used by two tasks at once.
+# The title lists read the recommender on the main thread, so the GUI pauses them while a load or an update runs.
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task when it has been cancelled."""
+
+
+class Task:
+    """Handle passed to a running task, used to report progress and to notice cancellation."""
+    def __init__(self, key, generation, messages):
+        self.key = key
+        self.generation = generation
+        self._messages = messages
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check(self):
+        """Raises TaskCancelled if the task has been cancelled."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def progress(self, fraction):
+        """Reports progress (a fraction between 0 and 1, or None if unknown) and stops the task if it was cancelled."""
+        self.check()
+        self._messages.put((self.key, self.generation, 'progress', fraction))
+
+
+class TaskRunner:
+    def __init__(self, root, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval  # Milliseconds between two checks of the message queue
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._messages = queue.Queue()
+        self._tasks = {}      # key -> latest task started with that key
+        self._callbacks = {}  # key -> callbacks of the latest task
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, key, function, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        """
+        Runs function(task) on the worker thread and calls on_done(result) on the main thread when it returns.
+        on_error(exception) is called if it raises, on_progress(fraction) for every progress report and
+        on_cancel() if it is cancelled. A task already started with the same key is cancelled and its
+        results are dropped.
+        """
+        previous = self._tasks.get(key)
+        generation = previous.generation + 1 if previous else 1
+        if previous is not None:
+            previous.cancel()
+        task = Task(key, generation, self._messages)
+        self._tasks[key] = task
+        self._callbacks[key] = (on_done, on_error, on_progress, on_cancel)
+
+        def run():
+            if task.is_cancelled():
+                self._messages.put((key, generation, 'cancelled', None))
+                return
+            try:
+                result = function(task)
+            except TaskCancelled:
+                self._messages.put((key, generation, 'cancelled', None))
+            except Exception as error:
+                self._messages.put((key, generation, 'error', error))
+            else:
+                self._messages.put((key, generation, 'done', result))
+
+        self._executor.submit(run)
+        return task
+
+    def cancel(self, key=None):
+        """Cancels the running task with the given key, or every task without a key."""
+        for task_key, task in self._tasks.items():
+            if key is None or task_key == key:
+                task.cancel()
+
+    def is_running(self, key):
+        """Returns True if a task with the given key has been started and has not finished yet."""
+        return key in self._tasks
+
+    def _poll(self):
+        """Delivers the queued messages of current tasks to their callbacks on the main thread."""
+        while True:
+            try:
+                key, generation, kind, value = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            task = self._tasks.get(key)
+            if task is None or task.generation != generation:
+                continue  # The message comes from a task that was superseded by a newer one
+            on_done, on_error, on_progress, on_cancel = self._callbacks[key]
+            if kind == 'progress':
+                if on_progress is not None and not task.is_cancelled():
+                    on_progress(value)
+                continue
+            # The task has finished
+            del self._tasks[key]
+            del self._callbacks[key]
+            if kind == 'done' and not task.is_cancelled():
+                if on_done is not None:
+                    on_done(value)
+            elif kind == 'error':
+                if on_error is not None:
+                    on_error(value)
+            elif on_cancel is not None:
+                on_cancel()
+        self.root.after(self.poll_interval, self._poll)
+
+    def shutdown(self):
+        """Cancels all tasks and stops the worker thread without waiting for a running task."""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
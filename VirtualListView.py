@@ -0,0 +1,112 @@
+# Author: Dingxin Hu /Ruiyang Hu
+# Date: 2026-10-18
+# Description: The VirtualListView class is a scrollable list for very long title lists.
+# Instead of inserting every row into a Text widget, it only asks for the rows that are currently
+# visible plus a few rows above and below them (the overscan), and shows them under a fixed header.
+# Scrolling with the scrollbar, the mouse wheel or the keyboard moves a window over the rows and
+# fetches the next rows when the window leaves the ones already fetched, so the list stays responsive
+# and uses little memory no matter how many titles are loaded.
+# The rows are fetched on the main thread, so the list can be paused while the data changes on another thread.
+
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+
+class VirtualListView(ttk.Frame):
+    def __init__(self, parent, fetch_rows, count_rows, header, empty_text='', overscan=50):
+        """
+        Creates the list inside the parent widget. fetch_rows(offset, limit) returns the formatted rows
+        starting at offset, count_rows() returns the total number of rows, and header is the first line.
+        empty_text is shown until refresh() is called for the first time.
+        """
+        super().__init__(parent)
+        self.fetch_rows = fetch_rows
+        self.count_rows = count_rows
+        self.header = header
+        self.overscan = overscan
+        self.top = 0  # Index of the first visible row
+        self.total = 0
+        self.loaded = False
+        self.paused = False  # While True, nothing is fetched and the rows shown last stay on screen
+        # Rows fetched around the visible window, starting at row self.cached_start
+        self.cached_start = 0
+        self.cached_rows = []
+
+        self.text = tk.Text(self, height=10, width=80, wrap='none')
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.text.pack(side='left', fill='both', expand=True)
+        self.text.insert('1.0', empty_text)
+        self.text.configure(state='disabled')
+
+        # The Text widget only holds the visible rows, so every kind of scrolling moves the window instead
+        self.text.bind('<Configure>', lambda event: self.render())
+        self.text.bind('<MouseWheel>', lambda event: self.scroll_by(-1 if event.delta > 0 else 1, 'units', 3))
+        self.text.bind('<Button-4>', lambda event: self.scroll_by(-1, 'units', 3))
+        self.text.bind('<Button-5>', lambda event: self.scroll_by(1, 'units', 3))
+        self.text.bind('<Up>', lambda event: self.scroll_by(-1, 'units'))
+        self.text.bind('<Down>', lambda event: self.scroll_by(1, 'units'))
+        self.text.bind('<Prior>', lambda event: self.scroll_by(-1, 'pages'))
+        self.text.bind('<Next>', lambda event: self.scroll_by(1, 'pages'))
+
+    def visible_rows(self):
+        """Returns how many rows fit below the header in the current height of the widget."""
+        line_height = tkfont.Font(font=self.text['font']).metrics('linespace')
+        return max(1, self.text.winfo_height() // max(1, line_height) - 1)
+
+    def refresh(self):
+        """Forgets the fetched rows and shows the list again, for example after new data was loaded."""
+        self.loaded = True
+        self.resume()
+
+    def pause(self):
+        """Stops fetching rows, for example while the data behind the list is changed on another thread."""
+        self.paused = True
+
+    def resume(self):
+        """Fetches rows again after pause, without keeping any row fetched before."""
+        self.paused = False
+        self.cached_rows = []
+        self.render()
+
+    def rows(self, start, count):
+        """Returns count rows from start, fetching them together with the overscan if they are not cached."""
+        end = min(start + count, self.total)
+        if start < self.cached_start or end > self.cached_start + len(self.cached_rows):
+            self.cached_start = max(0, start - self.overscan)
+            self.cached_rows = self.fetch_rows(self.cached_start, end - self.cached_start + self.overscan)
+        return self.cached_rows[start - self.cached_start:end - self.cached_start]
+
+    def render(self):
+        """Shows the header and the rows of the current window and updates the scrollbar."""
+        if not self.loaded or self.paused:
+            return
+        self.total = self.count_rows()
+        visible = self.visible_rows()
+        self.top = max(0, min(self.top, self.total - visible))
+        rows = self.rows(self.top, visible)
+
+        self.text.configure(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', "\n".join([self.header] + rows))
+        self.text.configure(state='disabled')
+        if self.total:
+            self.scrollbar.set(self.top / self.total, min(1.0, (self.top + visible) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_by(self, amount, what, step=1):
+        """Moves the window by a number of rows ('units') or of visible heights ('pages')."""
+        rows = self.visible_rows() if what == 'pages' else step
+        self.top += int(amount) * rows
+        self.render()
+        return 'break'
+
+    def on_scrollbar(self, action, *args):
+        """Handles the 'moveto' and 'scroll' commands sent by the scrollbar."""
+        if action == 'moveto':
+            self.top = int(float(args[0]) * self.total)
+            self.render()
+        elif action == 'scroll':
+            self.scroll_by(args[0], args[1])